@@ -0,0 +1,150 @@
+import os
+
+import pandas as pd
+
+import component_index
+
+NO_COMPONENT = "No Component"
+OTHER = "Other"
+# Components drawn individually in charts; smaller ones are folded into OTHER
+CHART_COMPONENTS = int(os.getenv("CHART_COMPONENTS", "15"))
+
+
+def component_cells(frame):
+    """The single pass over the rows: count, summed age and created range per (Component, Status).
+
+    Rows are grouped by component set, then each set's cells are credited
+    to every component in it, so a ticket counts under each of its
+    components while the pass over the rows stays a single groupby.
+    """
+    set_cells = frame.groupby(['Components', 'Status'], observed=True, sort=False).agg(
+        Count=('Key', 'size'),
+        Age=('Aging (Days)', 'sum'),
+        Latest=('Created', 'max'),
+        Oldest=('Created', 'min'),
+    ).reset_index()
+    pairs = component_index.split_sets(frame['Components'].cat.categories)
+    credited = set_cells.assign(Set=set_cells['Components'].cat.codes).merge(pairs, on='Set')
+    cells = credited.groupby(['Component', 'Status'], observed=True, sort=False).agg(
+        Count=('Count', 'sum'),
+        Age=('Age', 'sum'),
+        Latest=('Latest', 'max'),
+        Oldest=('Oldest', 'min'),
+    ).reset_index()
+
+    # Cells are few, so plain labels keep unobserved categories out of pivots and charts
+    return cells.astype({'Component': str, 'Status': str})
+
+
+def status_matrix(cells):
+    """Component x Status counts plus a Total column, largest first."""
+    matrix = cells.pivot(index='Component', columns='Status', values='Count').fillna(0).astype(int)
+    matrix['Total'] = matrix.sum(axis=1)
+    return matrix.sort_values('Total', ascending=False)
+
+
+def component_table(cells):
+    """One row per component with totals, average age, date range and status breakdown."""
+    by_component = cells.groupby('Component', observed=True, sort=False).agg(
+        Total=('Count', 'sum'),
+        Age=('Age', 'sum'),
+        Latest=('Latest', 'max'),
+        Oldest=('Oldest', 'min'),
+    )
+    ordered = cells.sort_values(['Component', 'Count'], ascending=[True, False], kind='stable')
+    labels = ordered['Status'].astype(str) + ': ' + ordered['Count'].astype(str)
+    breakdown = labels.groupby(ordered['Component'], observed=True, sort=False).agg('<br>'.join)
+    return pd.DataFrame({
+        'Component': by_component.index,
+        'Total Tickets': by_component['Total'].to_numpy(),
+        'Status Breakdown': breakdown.reindex(by_component.index).to_numpy(),
+        'Avg Age (Days)': (by_component['Age'] / by_component['Total']).round(1).to_numpy(),
+        'Latest Ticket': by_component['Latest'].to_numpy(),
+        'Oldest Ticket': by_component['Oldest'].to_numpy(),
+    }).sort_values('Total Tickets', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def summarise_components(frame):
+    """Aggregate an issue frame once for every home-page widget.
+
+    A single groupby over (Component, Status) yields the ticket count, total
+    age and created-date range of each cell; everything else is rolled up
+    from those cells, so no widget has to rescan the rows. A ticket with
+    several components counts under each of them. Returns a dict:
+
+    - `counts`: long table of Component, Status, Count
+    - `matrix`: Component x Status counts plus a Total column, largest first
+    - `components`: one row per component with Total, Avg Age (Days),
+      Latest Ticket, Oldest Ticket and an HTML Status Breakdown, largest first
+    - `tickets`: the number of distinct tickets
+    """
+    cells = component_cells(frame)
+    return {
+        'counts': cells[['Component', 'Status', 'Count']],
+        'matrix': status_matrix(cells),
+        'components': component_table(cells),
+        'tickets': len(frame),
+    }
+
+
+def hover_text(components):
+    """Pie-chart hover labels built from `summarise_components()['components']`."""
+    return [
+        f"<b>{component}</b><br>Total: {total}<br><br>Status Breakdown:<br>{breakdown}"
+        for component, total, breakdown in zip(
+            components['Component'], components['Total Tickets'], components['Status Breakdown']
+        )
+    ]
+
+
+def top_components(components, counts, n=CHART_COMPONENTS):
+    """Bound chart input to the `n` largest components plus one OTHER entry.
+
+    Takes and returns the `components` and `counts` tables of
+    `summarise_components()` (`components` may already exclude some rows),
+    so a chart's size depends on `n` rather than on the board.
+    """
+    if len(components) <= n:
+        return components, counts[counts['Component'].isin(components['Component'])]
+    top, tail = components.iloc[:n], components.iloc[n:]
+    counts = counts[counts['Component'].isin(components['Component'])]
+    kept = counts['Component'].isin(top['Component'])
+    tail_counts = counts[~kept].groupby('Status', sort=False)['Count'].sum().sort_values(ascending=False)
+    tail_total = tail['Total Tickets'].sum()
+    other = pd.DataFrame({
+        'Component': [OTHER],
+        'Total Tickets': [tail_total],
+        'Status Breakdown': ['<br>'.join(
+            [f"{len(tail)} smaller components"]
+            + [f"{status}: {count}" for status, count in tail_counts.items()]
+        )],
+        'Avg Age (Days)': [round((tail['Avg Age (Days)'] * tail['Total Tickets']).sum() / tail_total, 1)],
+        'Latest Ticket': [tail['Latest Ticket'].max()],
+        'Oldest Ticket': [tail['Oldest Ticket'].min()],
+    })
+    other_counts = pd.DataFrame({
+        'Component': OTHER,
+        'Status': tail_counts.index.astype(str),
+        'Count': tail_counts.to_numpy(),
+    })
+    return (pd.concat([top, other], ignore_index=True),
+            pd.concat([counts[kept], other_counts], ignore_index=True))
+
+
+def project_rollup(frame, done_statuses):
+    """One row per project: ticket counts, untagged tickets, average age and people."""
+    flags = frame.assign(
+        Done=frame['Status'].isin(done_statuses),
+        Untagged=frame['Component'] == NO_COMPONENT,
+    )
+    rollup = flags.groupby('Project', observed=True).agg(**{
+        'Total Tickets': ('Key', 'size'),
+        'Done': ('Done', 'sum'),
+        'No Component': ('Untagged', 'sum'),
+        'Avg Age (Days)': ('Aging (Days)', 'mean'),
+        'Assignees': ('Assignee', 'nunique'),
+    })
+    rollup.insert(1, 'Open', rollup['Total Tickets'] - rollup['Done'])
+    rollup['Avg Age (Days)'] = rollup['Avg Age (Days)'].round(1)
+    rollup = rollup.sort_values('Total Tickets', ascending=False).reset_index()
+    return rollup.astype({'Project': str})
@@ -0,0 +1,30 @@
+from collections import namedtuple
+
+# Statuses shown as metric cards in the Dev Utilisation view
+METRIC_STATUSES = ["In Progress", "Done", "To Do"]
+
+# Everything the Dev Utilisation view needs for one assignee: `rows` are
+# positions in the frame the index was built from, `status_counts` is a
+# Series of non-zero counts (largest first), `metrics` maps METRIC_STATUSES
+# to counts.
+AssigneeView = namedtuple("AssigneeView", ["rows", "total", "status_counts", "metrics"])
+
+
+def build(frame):
+    """Group an issue frame once into {assignee: AssigneeView}.
+
+    One groupby yields every assignee's row positions and status counts, so
+    switching developers in the view is a dictionary lookup.
+    """
+    counts = frame.groupby(['Assignee', 'Status'], observed=True).size()
+    index = {}
+    for assignee, rows in frame.groupby('Assignee', observed=True).indices.items():
+        status_counts = counts.loc[assignee].sort_values(ascending=False, kind='stable')
+        status_counts.index = status_counts.index.astype(str)
+        index[str(assignee)] = AssigneeView(
+            rows,
+            len(rows),
+            status_counts,
+            {status: int(status_counts.get(status, 0)) for status in METRIC_STATUSES},
+        )
+    return index
@@ -0,0 +1,162 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import date
+
+import aggregations
+import charts
+import issue_store
+import synthetic_jira
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+TODAY = date(2026, 1, 1)
+# Issues run through the pipeline once before anything is timed
+WARM_UP_SIZE = 100
+
+# Regression budgets per stage: (fixed seconds, seconds per 100k issues).
+# Roughly twice the times measured on a developer laptop, so --check only
+# trips on real regressions.
+BUDGETS = {
+    "extract": (0.05, 1.2),
+    "frame": (0.05, 2.0),
+    "aging": (0.01, 0.02),
+    "aggregate": (0.05, 0.05),
+    "pivot": (0.05, 0.02),
+    "figures": (0.3, 0.1),
+}
+
+
+def _figures(summary):
+    # Bounded the way the dashboard draws them
+    components, counts = aggregations.top_components(summary['components'], summary['counts'])
+    pie = charts.component_pie(components)
+    bar = charts.status_bar(counts)
+    # Serialising is what Streamlit does with every figure it renders
+    return len(pie.to_json()) + len(bar.to_json())
+
+
+def _stages(raw_issues):
+    """Each pipeline stage as (name, callable), in dashboard order.
+
+    A stage's callable receives the previous stage's result.
+    """
+    return [
+        ("extract", lambda _: issue_store.issue_columns(raw_issues)),
+        ("frame", lambda columns: issue_store.build_frame(columns, today=TODAY)),
+        ("aging", lambda frame: (issue_store.aging_days(frame["Created"], TODAY), frame)[1]),
+        ("aggregate", aggregations.component_cells),
+        ("pivot", lambda cells: {
+            'counts': cells[['Component', 'Status', 'Count']],
+            'matrix': aggregations.status_matrix(cells),
+            'components': aggregations.component_table(cells),
+        }),
+        ("figures", _figures),
+    ]
+
+
+def _run_pipeline(raw_issues, measure):
+    results = {}
+    value = None
+    for name, stage in _stages(raw_issues):
+        value, results[name] = measure(stage, value)
+    return results
+
+
+def _timed(stage, value):
+    started = time.perf_counter()
+    result = stage(value)
+    return result, time.perf_counter() - started
+
+
+def _peak_memory(stage, value):
+    tracemalloc.start()
+    try:
+        result = stage(value)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(size, repeat=3, seed=0):
+    """Benchmark every stage on `size` synthetic issues.
+
+    Times are the best of `repeat` runs, after an untimed warm-up on a few
+    issues; peak memory comes from a separate traced run so tracing doesn't
+    skew the timings.
+    """
+    raw_issues = synthetic_jira.generate_issues(size, seed=seed)
+    # Untimed warm-up, so plotly's imports and first figure aren't billed to a stage
+    _run_pipeline(synthetic_jira.generate_issues(WARM_UP_SIZE, seed=seed), _timed)
+    runs = [_run_pipeline(raw_issues, _timed) for _ in range(repeat)]
+    memory = _run_pipeline(raw_issues, _peak_memory)
+    stages = {}
+    for name in runs[0]:
+        seconds = min(run[name] for run in runs)
+        stages[name] = {
+            "seconds": seconds,
+            "issues_per_second": size / seconds if seconds else float("inf"),
+            "peak_mb": memory[name] / 2 ** 20,
+        }
+    return {"size": size, "stages": stages, "total_seconds": sum(s["seconds"] for s in stages.values())}
+
+
+def budget(name, size):
+    fixed, per_100k = BUDGETS[name]
+    return fixed + per_100k * size / 100_000
+
+
+def regressions(report):
+    """Descriptions of the stages that went over budget."""
+    failures = []
+    for name, stage in report["stages"].items():
+        allowed = budget(name, report["size"])
+        if stage["seconds"] > allowed:
+            failures.append(
+                f"{report['size']:,} issues: {name} took {stage['seconds']:.3f}s (budget {allowed:.3f}s)"
+            )
+    return failures
+
+
+def print_report(report):
+    print(f"\n{report['size']:,} issues ({report['total_seconds']:.3f}s total)")
+    print(f"  {'stage':<10} {'seconds':>9} {'issues/s':>12} {'peak MB':>9}")
+    for name, stage in report["stages"].items():
+        print(f"  {name:<10} {stage['seconds']:>9.4f} {stage['issues_per_second']:>12,.0f} "
+              f"{stage['peak_mb']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's data pipeline on synthetic issues.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="issue counts to benchmark, e.g. 1000 10000 100000 500000")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per size (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any stage exceeds its budget")
+    args = parser.parse_args(argv)
+    # plotly.express trips a pandas deprecation on every bar chart
+    warnings.filterwarnings("ignore", category=FutureWarning, module="plotly")
+
+    reports = []
+    for size in args.sizes:
+        report = run(size, repeat=args.repeat, seed=args.seed)
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    if args.check:
+        failures = [failure for report in reports for failure in regressions(report)]
+        for failure in failures:
+            print(f"REGRESSION: {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
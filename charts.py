@@ -0,0 +1,83 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+import aggregations
+
+
+def component_pie(component_totals):
+    """Component distribution pie from `summarise_components()['components']`."""
+    fig = go.Figure(data=[go.Pie(
+        labels=component_totals['Component'],
+        values=component_totals['Total Tickets'],
+        hoverinfo='text',
+        text=aggregations.hover_text(component_totals),
+        textinfo='label+value',
+        textposition='outside',
+        hole=.3,
+        marker=dict(
+            colors=px.colors.qualitative.Set3,
+            line=dict(color='#ffffff', width=2)
+        )
+    )])
+
+    fig.update_layout(
+        title='Component-wise Ticket Distribution',
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5
+        ),
+        height=600,
+        margin=dict(t=100, b=100)
+    )
+    return fig
+
+
+def status_bar(counts):
+    """Stacked status bar per component from `summarise_components()['counts']`."""
+    fig = px.bar(
+        counts,
+        x='Component',
+        y='Count',
+        color='Status',
+        title='Work Items Distribution by Status',
+        height=400,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_layout(
+        xaxis=dict(
+            title='Component',
+            tickangle=45,
+            tickfont=dict(size=12, color='#002e6e')
+        ),
+        yaxis=dict(
+            title='Number of Work Items',
+            tickfont=dict(size=12, color='#002e6e')
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin=dict(t=100, b=100)
+    )
+    return fig
+
+
+def trend_lines(series, title, y_title):
+    """Line per column of a frame indexed by Date, e.g. from `history.open_counts()`."""
+    fig = px.line(
+        series,
+        title=title,
+        height=400,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_layout(
+        xaxis=dict(title='Date', tickfont=dict(size=12, color='#002e6e')),
+        yaxis=dict(title=y_title, tickfont=dict(size=12, color='#002e6e')),
+        legend_title_text='',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin=dict(t=100, b=50)
+    )
+    return fig
@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Joins an issue's components in the frame's Components column; a control
+# character, so a component name containing ", " stays one component
+SEPARATOR = "\x1f"
+# Joins them in tables and exports
+DISPLAY_SEPARATOR = ", "
+
+# Which rows carry each component. `names` is an Index of every component;
+# the rows of names[i] are rows[offsets[i]:offsets[i + 1]], sorted frame
+# positions, so the whole index is one int32 per (issue, component) pair.
+ComponentIndex = namedtuple("ComponentIndex", ["names", "offsets", "rows"])
+
+
+def split_sets(categories):
+    """Long (Set, Component) table of the component sets in a Components column.
+
+    `Set` is the set's category code. There are only as many sets as
+    distinct component combinations, so this is small whatever the board.
+    """
+    sets, names = [], []
+    for code, label in enumerate(categories):
+        for name in label.split(SEPARATOR):
+            sets.append(code)
+            names.append(name)
+    return pd.DataFrame({'Set': np.array(sets, dtype=np.int32), 'Component': names})
+
+
+def build(frame):
+    """Index the frame's Components column by component."""
+    components = frame['Components']
+    codes = components.cat.codes.to_numpy()
+    pairs = split_sets(components.cat.categories)
+    # Rows ordered by set, with each set's slice of them
+    by_set = np.argsort(codes, kind='stable').astype(np.int32)
+    set_offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(components.cat.categories)))])
+
+    names = pd.Index(sorted(pairs['Component'].unique()))
+    rows, offsets = [], [0]
+    for _, sets in pairs.groupby('Component', sort=True)['Set']:
+        component_rows = np.concatenate([by_set[set_offsets[s]:set_offsets[s + 1]] for s in sets])
+        component_rows.sort()
+        rows.append(component_rows)
+        offsets.append(offsets[-1] + len(component_rows))
+    return ComponentIndex(
+        names,
+        np.array(offsets, dtype=np.int64),
+        np.concatenate(rows) if rows else np.empty(0, dtype=np.int32),
+    )
+
+
+def rows(index, component):
+    """Sorted positions of the rows tagged with `component` (empty if none are)."""
+    if component not in index.names:
+        return index.rows[:0]
+    i = index.names.get_loc(component)
+    return index.rows[index.offsets[i]:index.offsets[i + 1]]
+
+
+def contains(components, component):
+    """Mask of the rows of a Components column that are tagged with `component`.
+
+    For frames without an index (e.g. already narrowed ones); compares set
+    codes rather than strings.
+    """
+    pairs = split_sets(components.cat.categories)
+    sets = pairs['Set'][pairs['Component'] == component].to_numpy()
+    return pd.Series(np.isin(components.cat.codes.to_numpy(), sets), index=components.index)
+
+
+def component_names(components):
+    """Every component used by the rows of a Components column, sorted."""
+    codes = components.cat.codes.to_numpy()
+    used = components.cat.categories[np.unique(codes[codes >= 0])]
+    return sorted(set(split_sets(used)['Component']))
+
+
+def display(frame):
+    """`frame` with its Components labels joined by DISPLAY_SEPARATOR, for tables and exports."""
+    components = frame['Components']
+    labels = components.cat.categories.str.replace(SEPARATOR, DISPLAY_SEPARATOR, regex=False)
+    # Different sets can read the same once joined, so the labels are factorized again
+    codes, uniques = pd.factorize(labels)
+    return frame.assign(Components=pd.Categorical.from_codes(codes[components.cat.codes.to_numpy()], uniques))
@@ -0,0 +1,154 @@
+import os
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import aggregations
+import component_index
+import metrics
+import search_index
+
+# Component suggestion configuration
+SUGGESTION_FEATURES = int(os.getenv("SUGGESTION_FEATURES", str(2 ** 13)))   # hashed word and word-pair buckets
+SMOOTHING = 0.1
+
+SUGGESTION_COLUMNS = ["Key", "Suggested Component", "Confidence"]
+
+
+def hashed_features(texts, features=SUGGESTION_FEATURES):
+    """Hashed words and word pairs of each text, as (offsets, ids).
+
+    The features of texts[i] are ids[offsets[i]:offsets[i + 1]]; a word
+    used twice appears twice.
+    """
+    ids, offsets = [], [0]
+    for text in texts:
+        words = search_index.words(text)
+        terms = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+        ids.extend(zlib.crc32(term.encode()) % features for term in terms)
+        offsets.append(len(ids))
+    return np.array(offsets, dtype=np.int64), np.array(ids, dtype=np.int64)
+
+
+class ComponentModel:
+    """Multinomial naive Bayes from summaries to components, trained incrementally.
+
+    A linear model over hashed bag-of-words features: training only adds
+    the word counts of new or edited tagged tickets (and takes back those of
+    edited or deleted ones), so keeping up with a sync costs little. A
+    ticket with several components counts towards each of them. Counts are
+    float32, one row of SUGGESTION_FEATURES per component.
+    """
+
+    def __init__(self, features=SUGGESTION_FEATURES):
+        self.features = features
+        self.components = []
+        self._component_ids = {}
+        self.counts = np.zeros((0, features), dtype=np.float32)
+        self.documents = np.zeros(0)
+        # What the counts were trained on, indexed by Key
+        self.trained = pd.DataFrame({'Text': pd.Series(dtype=object), 'Components': pd.Series(dtype=object)})
+        self._weights = None
+
+    def _component_id(self, name):
+        component_id = self._component_ids.get(name)
+        if component_id is None:
+            component_id = self._component_ids[name] = len(self.components)
+            self.components.append(name)
+        return component_id
+
+    def _count(self, texts, component_sets, sign):
+        if not len(texts):
+            return
+        offsets, ids = hashed_features(texts, self.features)
+        # One (ticket, component) pair per component of each ticket
+        tickets, labels = [], []
+        for ticket, names in enumerate(component_sets):
+            for name in names.split(component_index.SEPARATOR):
+                tickets.append(ticket)
+                labels.append(self._component_id(name))
+        tickets, labels = np.array(tickets, dtype=np.int64), np.array(labels, dtype=np.int64)
+        lengths = np.diff(offsets)[tickets]
+        firsts = np.cumsum(lengths) - lengths
+        positions = np.repeat(offsets[tickets], lengths) + np.arange(lengths.sum()) - np.repeat(firsts, lengths)
+
+        if len(self.documents) < len(self.components):
+            grown = len(self.components) - len(self.documents)
+            self.counts = np.vstack([self.counts, np.zeros((grown, self.features), dtype=np.float32)])
+            self.documents = np.concatenate([self.documents, np.zeros(grown)])
+        # Only the cells these tickets touch are updated
+        np.add.at(self.counts, (np.repeat(labels, lengths), ids[positions]), np.float32(sign))
+        np.add.at(self.documents, labels, sign)
+        self._weights = None
+
+    def train(self, frame):
+        """Bring the model up to date with the tagged tickets of an issue frame.
+
+        Returns how many tickets were added, changed or removed since the
+        last call.
+        """
+        tagged = frame[frame['Component'] != aggregations.NO_COMPONENT]
+        current = pd.DataFrame({
+            'Text': tagged['Summary'].fillna("").to_numpy(),
+            'Components': tagged['Components'].astype(str).to_numpy(),
+        }, index=tagged['Key'].to_numpy())
+        joined = self.trained.join(current, how='outer', lsuffix=' Before')
+        unchanged = (joined['Text Before'] == joined['Text']) & (joined['Components Before'] == joined['Components'])
+        before = joined[~unchanged & joined['Text Before'].notna()]
+        after = joined[~unchanged & joined['Text'].notna()]
+        self._count(before['Text Before'].tolist(), before['Components Before'].tolist(), -1)
+        self._count(after['Text'].tolist(), after['Components'].tolist(), 1)
+        self.trained = current
+        metrics.inc("suggestion_model_updates", int((~unchanged).sum()))
+        return int((~unchanged).sum())
+
+    def _log_weights(self):
+        # Per-feature log likelihoods (components x features) and log priors
+        if self._weights is None:
+            likelihood = np.log(self.counts + SMOOTHING) - np.log(
+                self.counts.sum(axis=1, keepdims=True) + SMOOTHING * self.features
+            )
+            # Components no ticket carries any more are never suggested
+            prior = np.where(self.documents > 0, np.log(np.maximum(self.documents, 1)) - np.log(max(self.documents.sum(), 1)), -np.inf)
+            self._weights = (likelihood.astype(np.float32), prior)
+        return self._weights
+
+    def suggest(self, tickets):
+        """The likeliest component for each ticket, scored in one batch.
+
+        Returns a frame of SUGGESTION_COLUMNS; Confidence is the model's
+        probability for the suggestion. Empty until any tagged ticket has
+        been trained on.
+        """
+        if not (self.documents > 0).any() or tickets.empty:
+            return pd.DataFrame(columns=SUGGESTION_COLUMNS)
+        likelihood, prior = self._log_weights()
+        offsets, ids = hashed_features(tickets['Summary'].fillna("").tolist(), self.features)
+        owners = np.repeat(np.arange(len(tickets)), np.diff(offsets))
+        # Summed log likelihoods per ticket, one component at a time, so no
+        # feature occurrences x components array is ever built
+        scores = np.empty((len(prior), len(tickets)))
+        for component, weights in enumerate(likelihood):
+            scores[component] = np.bincount(owners, weights=weights[ids], minlength=len(tickets))
+        scores = scores.T + prior
+        best = scores.argmax(axis=1)
+        probabilities = np.exp(scores - scores[np.arange(len(best)), best][:, None])
+        confidence = 1 / probabilities.sum(axis=1)
+        return pd.DataFrame({
+            'Key': tickets['Key'].to_numpy(),
+            'Suggested Component': np.array(self.components, dtype=object)[best],
+            'Confidence': confidence.round(2),
+        })
+
+
+_model = ComponentModel()
+_model_lock = threading.Lock()
+
+
+def refresh(frame):
+    """Train the process-wide model on a new frame and suggest components for its untagged tickets."""
+    with _model_lock, metrics.timed("suggestions.refresh"):
+        _model.train(frame)
+        return _model.suggest(frame[frame['Component'] == aggregations.NO_COMPONENT])
@@ -1,24 +1,33 @@
 import streamlit as st
-from jira import JIRA
 import pandas as pd
 from dotenv import load_dotenv
-import os
 import plotly.express as px
-from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from datetime import date, datetime, timedelta
+
+import aggregations
+import charts
+import component_index
+import exports
+import flow_metrics
+import history
+import issue_store
+import jira_gateway
+import metrics
+import outbox
+import query_cache
+import reminders
+import report
+import search_index
+import sync_worker
+import webhooks
 
 # Load credentials
 load_dotenv()
 
-# Email configuration
-SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-SMTP_USERNAME = os.getenv("SMTP_USERNAME")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-SENDER_EMAIL = os.getenv("SENDER_EMAIL")
+JIRA_URL = jira_gateway.JIRA_URL
+
+# Times each phase of this rerun; shown in the sidebar behind the admin toggle
+rerun_trace = metrics.Trace("rerun")
 
 # Initialize session state for page navigation and selected developer
 if 'current_page' not in st.session_state:
@@ -198,76 +207,93 @@ def create_header(page_title):
     with col3:
         st.write("")
 
+# Per-phase timings of a trace as a small table, in milliseconds
+def timings_table(trace):
+    st.dataframe(
+        pd.DataFrame({
+            "Phase": list(trace.phases) + ["total"],
+            "ms": [seconds * 1000 for seconds in trace.phases.values()] + [trace.seconds * 1000],
+        }),
+        column_config={"ms": st.column_config.NumberColumn("ms", format="%.1f")},
+        hide_index=True,
+        use_container_width=True
+    )
+
+# Answer a query from the current snapshot (used on cache misses)
+def load_issues(query):
+    return query_cache.narrow(snapshot.frame, query, snapshot.components)
+
+# Export controls: the file is only written when asked for, then shared by
+# every session until the data version changes; `view` keys the file and
+# `name` only names the download
+def export_controls(label, view, name, frame, key):
+    format_col, button_col = st.columns([1, 3])
+    with format_col:
+        fmt = st.selectbox("Format", list(exports.FORMATS), key=f"{key}_format", label_visibility="collapsed")
+    with button_col:
+        wanted = (snapshot.version, view, fmt)
+        ready = exports.cached(*wanted) if st.session_state.get(f"{key}_ready") == wanted else None
+        if ready is None and st.button(f"Prepare {label}", key=f"{key}_prepare"):
+            with metrics.timed("rerun.export"):
+                ready = exports.export(
+                    snapshot.version, view, name,
+                    lambda: component_index.display(frame() if callable(frame) else frame), fmt
+                )
+            st.session_state[f"{key}_ready"] = wanted
+        if ready is not None:
+            with open(ready.path, "rb") as f:
+                st.download_button(f"Download {label} ({ready.rows:,} rows)", f, ready.file_name, ready.mime, key=key)
+
 # Sidebar menu with improved styling
 st.sidebar.markdown("### Menu")
 st.sidebar.markdown("### Tech Alignment")
 qa_util = st.sidebar.button("QA Utilisation", key="qa_util")
 dev_util = st.sidebar.button("Dev Utilisation", key="dev_util")
+duplicate_tickets = st.sidebar.button("Duplicate Tickets", key="duplicate_tickets")
 
-# Initialize JIRA connection
-try:
-    JIRA_URL = os.getenv("JIRA_URL")
-    JIRA_EMAIL = os.getenv("JIRA_EMAIL")
-    JIRA_TOKEN = os.getenv("JIRA_TOKEN")
-    
-    jira = JIRA(server=JIRA_URL, token_auth=(JIRA_TOKEN))
-    user = jira.current_user()
-    st.sidebar.success(f"Connected to Jira as: {user}")
-except Exception as e:
-    st.error(f"Failed to connect to Jira: {e}")
+# The background worker syncs Jira and publishes snapshots; reruns only read them
+sync_worker.start()
+outbox.start(prepare=reminders.prepare_reminders)
+metrics.start_exporter()
+webhooks.start(on_change=sync_worker.wake)
+with metrics.timed("rerun.snapshot"):
+    snapshot = sync_worker.latest(timeout=60)
+if sync_worker.connected_user:
+    st.sidebar.success(f"Connected to Jira as: {sync_worker.connected_user}")
+if snapshot is None:
+    if sync_worker.last_error:
+        st.error(f"Failed to connect to Jira: {sync_worker.last_error}")
+    else:
+        st.info("Still loading issues from Jira. Please refresh in a moment.")
     st.stop()
+if sync_worker.last_error:
+    st.sidebar.warning(f"Jira sync failed, showing stored data. {sync_worker.last_error}")
 
 # Fetch JIRA data
 try:
-    JQL = 'project = PGP AND status not in (Queue) ORDER BY updated DESC'
-    issues = jira.search_issues(JQL, maxResults=100)
-    
-    # Handle Task Category field properly
-    task_category = getattr(issues[0].fields, 'customfield_21928', None)
-    if task_category:
-        if hasattr(task_category, 'value'):
-            task_category = task_category.value
-        elif hasattr(task_category, 'name'):
-            task_category = task_category.name
-        else:
-            task_category = str(task_category)
-    else:
-        task_category = 'Not Set'
-
-    # Calculate ticket aging
-    try:
-        created_date = datetime.strptime(issues[0].fields.created[:10], '%Y-%m-%d')
-        current_date = datetime.now()
-        aging_days = (current_date - created_date).days
-    except Exception as e:
-        aging_days = 0
-
-    data = []
-    for issue in issues:
-        data.append({
-            "Key": issue.key,
-            "Summary": issue.fields.summary,
-            "Component": getattr(issue.fields.components[0], "name", "No Component") if issue.fields.components else "No Component",
-            "Status": issue.fields.status.name,
-            "Assignee": getattr(issue.fields.assignee, "displayName", "Unassigned"),
-            "Created": issue.fields.created[:10],
-            "Issue Type": issue.fields.issuetype.name,
-            "Priority": issue.fields.priority.name if hasattr(issue.fields, 'priority') else "No Priority",
-            "Task Category": task_category,
-            "Aging (Days)": aging_days
-        })
-    
-    df = pd.DataFrame(data)
+    # Every filter below is a subset of this frame of all configured projects,
+    # so the shared cache answers them locally from the snapshot
+    data_version = snapshot.version
+    with metrics.timed("rerun.query"):
+        df = query_cache.results.get(data_version, query_cache.make_query(), load_issues)
+    if df.empty:
+        st.warning("No issues found in the local issue store.")
+        st.stop()
     
     # Display raw data information
     st.sidebar.markdown("### Data Processing Information")
     st.sidebar.markdown(f"**Total Records Processed:** {len(df)}")
-    st.sidebar.markdown(f"**Unique Components:** {len(df['Component'].unique())}")
+    st.sidebar.markdown(f"**Unique Components:** {len(snapshot.components.names)}")
     st.sidebar.markdown(f"**Unique Statuses:** {len(df['Status'].unique())}")
     st.sidebar.markdown(f"**Unique Assignees:** {len(df['Assignee'].unique())}")
+    st.sidebar.markdown(f"**Data As Of:** {snapshot.synced_at:%Y-%m-%d %H:%M:%S}")
+    st.sidebar.markdown(f"**Snapshot Version:** {snapshot.version}")
+    show_timings = st.sidebar.toggle("Admin: show timings", key="show_timings")
+    # Filled in at the end of the rerun, once every phase has been timed
+    timings_slot = st.sidebar.container()
 
     # Handle Dev Utilization view
-    if dev_util or st.session_state.current_page == 'dev_util':
+    if dev_util or (st.session_state.current_page == 'dev_util' and not (qa_util or duplicate_tickets)):
         st.session_state.current_page = 'dev_util'
         
         # Create header with page title
@@ -279,8 +305,8 @@ try:
             st.session_state.selected_developer = None
             st.rerun()
         
-        # Get unique assignees and sort them
-        assignees = sorted(df['Assignee'].unique())
+        # Every assignee on the board, grouped once per snapshot
+        assignees = sorted(snapshot.assignees)
         
         # Add assignee dropdown with a default value
         if not assignees:
@@ -293,7 +319,8 @@ try:
             selected_assignee = st.selectbox(
                 "Select Developer",
                 options=assignees,
-                index=0 if st.session_state.selected_developer is None else assignees.index(st.session_state.selected_developer),
+                index=assignees.index(st.session_state.selected_developer)
+                if st.session_state.selected_developer in assignees else 0,
                 key="developer_select",
                 on_change=on_developer_change
             )
@@ -301,68 +328,106 @@ try:
             # Update session state
             st.session_state.selected_developer = selected_assignee
             
-            # Filter data for selected assignee
-            assignee_df = df[df['Assignee'] == selected_assignee]
+            # Rows, counts and export were precomputed; switching is a lookup
+            assignee_view = snapshot.assignees.get(selected_assignee)
             
-            if assignee_df.empty:
+            if assignee_view is None:
                 st.warning(f"No data found for {selected_assignee}")
             else:
-                # Calculate metrics
-                total_tickets = len(assignee_df)
-                status_counts = assignee_df['Status'].value_counts()
+                assignee_df = snapshot.frame.iloc[assignee_view.rows]
+                status_counts = assignee_view.status_counts
                 
                 # Display metrics in columns with improved styling
                 st.markdown("### Key Metrics")
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Total Tickets", total_tickets)
+                    st.metric("Total Tickets", assignee_view.total)
                 with col2:
-                    st.metric("In Progress", len(assignee_df[assignee_df['Status'] == 'In Progress']))
+                    st.metric("In Progress", assignee_view.metrics['In Progress'])
                 with col3:
-                    st.metric("Done", len(assignee_df[assignee_df['Status'] == 'Done']))
+                    st.metric("Done", assignee_view.metrics['Done'])
                 with col4:
-                    st.metric("To Do", len(assignee_df[assignee_df['Status'] == 'To Do']))
+                    st.metric("To Do", assignee_view.metrics['To Do'])
                 
                 # Display detailed ticket information
                 st.markdown("### Detailed Ticket Information")
-                st.dataframe(
-                    assignee_df,
-                    column_config={
-                        "Key": st.column_config.TextColumn("JIRA Key", width="medium"),
-                        "Summary": st.column_config.TextColumn("Summary", width="large"),
-                        "Component": st.column_config.TextColumn("Component", width="medium"),
-                        "Status": st.column_config.TextColumn("Status", width="medium"),
-                        "Priority": st.column_config.TextColumn("Priority", width="medium"),
-                        "Created": st.column_config.TextColumn("Created Date", width="medium"),
-                        "Issue Type": st.column_config.TextColumn("Issue Type", width="medium"),
-                        "Task Category": st.column_config.TextColumn("Task Category", width="medium"),
-                        "Aging (Days)": st.column_config.NumberColumn("Aging (Days)", width="medium", format="%d")
-                    },
-                    hide_index=True,
-                    use_container_width=True
-                )
+                with metrics.timed("rerun.tables"):
+                    st.dataframe(
+                        component_index.display(assignee_df),
+                        column_config={
+                            "Key": st.column_config.TextColumn("JIRA Key", width="medium"),
+                            "Summary": st.column_config.TextColumn("Summary", width="large"),
+                            "Component": st.column_config.TextColumn("Component", width="medium"),
+                            "Status": st.column_config.TextColumn("Status", width="medium"),
+                            "Priority": st.column_config.TextColumn("Priority", width="medium"),
+                            "Created": st.column_config.DateColumn("Created Date", width="medium", format="YYYY-MM-DD"),
+                            "Issue Type": st.column_config.TextColumn("Issue Type", width="medium"),
+                            "Task Category": st.column_config.TextColumn("Task Category", width="medium"),
+                            "Aging (Days)": st.column_config.NumberColumn("Aging (Days)", width="medium", format="%d")
+                        },
+                        hide_index=True,
+                        use_container_width=True
+                    )
                 
                 # Status Distribution
                 st.markdown("### Status Distribution")
-                fig = px.bar(
-                    x=status_counts.index,
-                    y=status_counts.values,
-                    title=f"Status Distribution for {selected_assignee}",
-                    labels={'x': 'Status', 'y': 'Number of Tickets'},
-                    color=status_counts.values,
-                    color_continuous_scale='RdYlGn'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                with metrics.timed("rerun.figures"):
+                    fig = px.bar(
+                        x=status_counts.index,
+                        y=status_counts.values,
+                        title=f"Status Distribution for {selected_assignee}",
+                        labels={'x': 'Status', 'y': 'Number of Tickets'},
+                        color=status_counts.values,
+                        color_continuous_scale='RdYlGn'
+                    )
+                with metrics.timed("rerun.charts"):
+                    st.plotly_chart(fig, use_container_width=True)
+                
+                # Open tickets day by day, from the recorded history
+                assignee_history = history.load("assignee_status", date.today() - timedelta(days=365))
+                if not assignee_history.empty:
+                    open_history = history.open_counts(assignee_history[assignee_history['Assignee'] == selected_assignee], 'Assignee')
+                    if not open_history.empty:
+                        st.markdown("### Open Tickets Over Time")
+                        with metrics.timed("rerun.charts"):
+                            st.plotly_chart(charts.trend_lines(open_history, f"Open Tickets for {selected_assignee}", 'Open Tickets'),
+                                            use_container_width=True)
                 
                 # Download button
-                csv = assignee_df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    "Download Developer Data",
-                    csv,
-                    f"{selected_assignee}_jira_data.csv",
-                    "text/csv",
-                    key='download-csv'
-                )
+                export_controls("Developer Data", ("assignee", selected_assignee), f"{selected_assignee}_jira_data",
+                                assignee_df, key='download-csv')
+
+    # Handle QA Utilization view
+    elif qa_util or (st.session_state.current_page == 'qa_util' and not duplicate_tickets):
+        st.session_state.current_page = 'qa_util'
+        
+        # Create header with page title
+        create_header("QA Resource Utilization")
+        
+        # Back to Home button
+        if st.button("← Back to Home", key="back_home_qa", help="Return to main dashboard"):
+            st.session_state.current_page = 'home'
+            st.rerun()
+        
+        # Imported on first visit, so sessions that never open the page don't pay for it
+        import qa_utilisation
+        qa_utilisation.render(snapshot, JIRA_URL)
+
+    # Handle Duplicate Tickets view
+    elif duplicate_tickets or st.session_state.current_page == 'duplicates':
+        st.session_state.current_page = 'duplicates'
+        
+        # Create header with page title
+        create_header("Duplicate Tickets")
+        
+        # Back to Home button
+        if st.button("← Back to Home", key="back_home_duplicates", help="Return to main dashboard"):
+            st.session_state.current_page = 'home'
+            st.rerun()
+        
+        # Imported on first visit, so sessions that never open the page don't pay for it
+        import duplicates
+        duplicates.render(snapshot, JIRA_URL)
 
     else:
         # Original dashboard view
@@ -372,7 +437,7 @@ try:
         # Create header with page title
         create_header("PG Board Dashboard")
         
-        # Component and Date Range Filters at the top
+        # Project, Component and Date Range Filters at the top
         st.markdown("### Filters")
         filter_col1, filter_col2 = st.columns(2)
         
@@ -381,7 +446,12 @@ try:
         default_start_date = default_end_date - timedelta(days=30)
         
         with filter_col1:
-            all_components = ["All"] + sorted(df['Component'].unique().tolist())
+            # The selector only appears once more than one project is configured
+            selected_project = "All"
+            if len(issue_store.PROJECTS) > 1:
+                selected_project = st.selectbox("Select Project", ["All"] + list(issue_store.PROJECTS), key="project")
+            project_df = query_cache.results.get(data_version, query_cache.make_query(selected_project), load_issues)
+            all_components = ["All"] + component_index.component_names(project_df['Components'])
             selected_component = st.selectbox("Select Component", all_components)
         
         with filter_col2:
@@ -401,44 +471,18 @@ try:
                     max_value=datetime.now()
                 )
 
-        # Build dynamic JQL query
-        jql_parts = ['project = PGP', 'status not in (Queue)']
-        
-        # Add component filter if selected
-        if selected_component != "All":
-            jql_parts.append(f'component = "{selected_component}"')
-        
-        # Add date range filter
-        jql_parts.append(f'created >= "{start_date}"')
-        jql_parts.append(f'created <= "{end_date}"')
-        
-        # Combine JQL parts
-        dynamic_jql = ' AND '.join(jql_parts)
+        # Build the query for the selected filters
+        query = query_cache.make_query(selected_project, selected_component, start_date, end_date)
+        dynamic_jql = query_cache.to_jql(query, issue_store.base_jql(query.project))
         
         # Display current JQL for verification
         st.sidebar.markdown("### Current JQL Query")
         st.sidebar.code(dynamic_jql, language="sql")
         
-        # Fetch data using dynamic JQL
+        # Read the matching issues through the shared result cache
         try:
-            issues = jira.search_issues(dynamic_jql, maxResults=1000)
-            
-            # Process fetched data
-            data = []
-            for issue in issues:
-                components = [c.name for c in issue.fields.components] if issue.fields.components else ['No Component']
-                data.append({
-                    "Key": issue.key,
-                    "Summary": issue.fields.summary,
-                    "Component": components[0],
-                    "Status": issue.fields.status.name,
-                    "Assignee": getattr(issue.fields.assignee, "displayName", "Unassigned"),
-                    "Created": issue.fields.created[:10],
-                    "Issue Type": issue.fields.issuetype.name,
-                    "Priority": issue.fields.priority.name if hasattr(issue.fields, 'priority') else "No Priority"
-                })
-            
-            filtered_df = pd.DataFrame(data)
+            with metrics.timed("rerun.query"):
+                filtered_df = query_cache.results.get(data_version, query, load_issues)
             
             if filtered_df.empty:
                 st.warning("No issues found matching the selected criteria.")
@@ -452,99 +496,94 @@ try:
             **Query Summary:**
             - Total Issues: {len(filtered_df)}
             - Date Range: Last {days_range} days ({start_date} to {end_date})
+            - Project: {query.project or ', '.join(issue_store.PROJECTS)}
             - Component: {selected_component}
             - Statuses: {', '.join(filtered_df['Status'].unique())}
             - Note: {no_component_count} ticket(s) are not assigned to any component. These tickets are excluded from the above distribution for better visibility of assigned components.
             """)
             
+            # Side-by-side totals when looking at every project
+            if query.project is None and len(issue_store.PROJECTS) > 1:
+                st.markdown("### Project Rollup")
+                with metrics.timed("rerun.aggregate"):
+                    rollup = aggregations.project_rollup(filtered_df, flow_metrics.DONE_STATUSES)
+                st.dataframe(rollup, hide_index=True, use_container_width=True)
+            
             # Add email reminder button for tickets without components
             if no_component_count > 0:
                 st.markdown("### Component Assignment Reminder")
+                # Suggestions were scored for every untagged ticket when the snapshot was published
+                untagged_df = filtered_df[filtered_df['Component'] == 'No Component'].merge(
+                    snapshot.suggestions, on='Key', how='left'
+                )
+                if untagged_df['Suggested Component'].notna().any():
+                    st.markdown("Suggested components, learned from the summaries of tagged tickets:")
+                    suggested = untagged_df.sort_values('Confidence', ascending=False, kind='stable').head(report.PAGE_SIZE)
+                    st.dataframe(
+                        suggested.assign(**{'JIRA Link': f"{JIRA_URL}/browse/" + suggested['Key']})[
+                            ['JIRA Link', 'Summary', 'Assignee', 'Suggested Component', 'Confidence']
+                        ],
+                        column_config={
+                            "JIRA Link": st.column_config.LinkColumn("JIRA ID", width="small", display_text=r"/browse/(.*)$"),
+                            "Summary": st.column_config.TextColumn("Summary", width="large", max_chars=100),
+                            "Confidence": st.column_config.ProgressColumn("Confidence", min_value=0, max_value=1, format="%.2f"),
+                        },
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    if len(untagged_df) > len(suggested):
+                        st.caption(f"The {len(suggested)} most confident of {len(untagged_df):,} untagged tickets; "
+                                   "every reminder email includes its ticket's suggestion")
                 st.markdown("Would you like to send reminder emails to ticket owners for adding components?")
+                dry_run = st.checkbox("Dry run (deliver to the local SMTP stand-in)", key="reminder_dry_run")
                 if st.button("Send Component Reminder Emails"):
-                    with st.spinner("Sending reminder emails..."):
-                        if send_component_reminder_emails(filtered_df):
-                            st.success("Reminder emails sent successfully!")
-                        else:
-                            st.error("Failed to send reminder emails. Please check the email configuration.")
+                    if not dry_run and not outbox.email_configured():
+                        st.error("Email configuration is missing. Please set SMTP_USERNAME, SMTP_PASSWORD, and SENDER_EMAIL in .env file.")
+                    else:
+                        try:
+                            result = reminders.queue_component_reminders(untagged_df, dry_run=dry_run)
+                            st.success(f"Queued reminders for {result.queued} ticket(s); one email per assignee "
+                                       "is prepared and sent in the background.")
+                            if result.already_reminded:
+                                st.info(f"{result.already_reminded} ticket(s) were already reminded today and were skipped.")
+                        except Exception as e:
+                            st.error(f"Error queueing emails: {str(e)}")
+                
+                # Delivery progress from the outbox
+                outbox_counts = outbox.counts()
+                st.caption(
+                    f"Reminder outbox: {outbox_counts['pending']} ticket(s) awaiting their assignee's email, "
+                    f"{outbox_counts['queued'] + outbox_counts['sending']} queued, "
+                    f"{outbox_counts['sent']} sent, {outbox_counts['failed']} failed"
+                )
+                unresolved = outbox.unresolved_tickets()
+                if unresolved:
+                    st.warning(f"No email address found today for the assignee of: {', '.join(unresolved)}")
             
             # Add Component Distribution Pie Chart
             st.markdown("### Component Distribution")
             
-            # Calculate aging for each ticket first
-            filtered_df['Aging (Days)'] = filtered_df['Created'].apply(
-                lambda x: (datetime.now() - pd.to_datetime(x)).days
-            )
-            
-            # Calculate component-wise totals
-            component_totals = filtered_df.groupby('Component').size().reset_index(name='Total')
+            # Aggregate once; every widget below renders from this summary
+            with metrics.timed("rerun.aggregate"):
+                summary = aggregations.summarise_components(filtered_df)
             
             # Separate No Component entries
-            no_component_count = component_totals[component_totals['Component'] == 'No Component']['Total'].sum() if 'No Component' in component_totals['Component'].values else 0
-            component_totals = component_totals[component_totals['Component'] != 'No Component']
-            
-            # Sort by total
-            component_totals = component_totals.sort_values('Total', ascending=False)
-            
-            # Create hover text with status breakdown
-            hover_text = []
-            for component in component_totals['Component']:
-                component_data = filtered_df[filtered_df['Component'] == component]
-                status_breakdown = component_data['Status'].value_counts()
-                breakdown_text = '<br>'.join([f"{status}: {count}" for status, count in status_breakdown.items()])
-                hover_text.append(f"<b>{component}</b><br>Total: {len(component_data)}<br><br>Status Breakdown:<br>{breakdown_text}")
+            component_totals = summary['components']
+            component_totals = component_totals[component_totals['Component'] != aggregations.NO_COMPONENT]
             
-            # Create pie chart
-            fig = go.Figure(data=[go.Pie(
-                labels=component_totals['Component'],
-                values=component_totals['Total'],
-                hoverinfo='text',
-                text=hover_text,
-                textinfo='label+value',
-                textposition='outside',
-                hole=.3,
-                marker=dict(
-                    colors=px.colors.qualitative.Set3,
-                    line=dict(color='#ffffff', width=2)
-                )
-            )])
-            
-            # Update layout
-            fig.update_layout(
-                title='Component-wise Ticket Distribution',
-                showlegend=True,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=-0.2,
-                    xanchor="center",
-                    x=0.5
-                ),
-                height=600,
-                margin=dict(t=100, b=100)
-            )
+            # Create pie chart of the largest components; the rest share one slice
+            with metrics.timed("rerun.figures"):
+                pie_slices = aggregations.top_components(component_totals, summary['counts'])[0]
+                fig = charts.component_pie(pie_slices)
             
-            st.plotly_chart(fig, use_container_width=True)
+            with metrics.timed("rerun.charts"):
+                st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{summary['tickets']:,} distinct tickets; a ticket with several components counts under each of them.")
             
             # Add collapsible component-wise table
             with st.expander("View Component-wise Details", expanded=False):
-                # Create detailed component table
-                component_details = []
-                for component in component_totals['Component']:
-                    component_data = filtered_df[filtered_df['Component'] == component]
-                    status_counts = component_data['Status'].value_counts()
-                    component_details.append({
-                        'Component': component,
-                        'Total Tickets': len(component_data),
-                        'Status Breakdown': '<br>'.join([f"{status}: {count}" for status, count in status_counts.items()]),
-                        'Avg Age (Days)': round(component_data['Aging (Days)'].mean(), 1),
-                        'Latest Ticket': component_data['Created'].max(),
-                        'Oldest Ticket': component_data['Created'].min()
-                    })
-                
-                # Convert to DataFrame and sort by total tickets
-                component_df = pd.DataFrame(component_details)
-                component_df = component_df.sort_values('Total Tickets', ascending=False)
+                # Component details come straight from the shared summary
+                component_df = component_totals
                 
                 # Display the table
                 st.dataframe(
@@ -569,13 +608,15 @@ try:
                             width="small",
                             format="%.1f"
                         ),
-                        "Latest Ticket": st.column_config.TextColumn(
+                        "Latest Ticket": st.column_config.DateColumn(
                             "Latest Ticket",
-                            width="small"
+                            width="small",
+                            format="YYYY-MM-DD"
                         ),
-                        "Oldest Ticket": st.column_config.TextColumn(
+                        "Oldest Ticket": st.column_config.DateColumn(
                             "Oldest Ticket",
-                            width="small"
+                            width="small",
+                            format="YYYY-MM-DD"
                         )
                     },
                     hide_index=True,
@@ -586,21 +627,8 @@ try:
             st.markdown("### Work Volume Matrix")
             st.markdown("Component-wise work distribution")
             
-            # Create matrix data
-            matrix_data = pd.pivot_table(
-                filtered_df,
-                values='Key',
-                index=['Component'],
-                columns=['Status'],
-                aggfunc='count',
-                fill_value=0
-            )
-            
-            # Calculate total
-            matrix_data['Total'] = matrix_data.sum(axis=1)
-            
-            # Sort by total
-            matrix_data = matrix_data.sort_values('Total', ascending=False)
+            # Matrix is already sorted by total in the shared summary
+            matrix_data = summary['matrix']
             
             # Display matrix with custom styling
             def highlight_total(val):
@@ -627,104 +655,170 @@ try:
             })
             
             # Display matrix with adjusted column widths
-            st.dataframe(
-                styled_matrix,
-                use_container_width=True,
-                height=400
-            )
+            with metrics.timed("rerun.tables"):
+                st.dataframe(
+                    styled_matrix,
+                    use_container_width=True,
+                    height=400
+                )
+
+            # Where tickets actually sit, from the stored status history
+            st.markdown("### Time in Status & Cycle Time")
+            flow_by = st.radio("Group by", ["Component", "Assignee"], horizontal=True, key="flow_by")
+            with metrics.timed("rerun.flow"):
+                status_days = flow_metrics.time_in_status(snapshot.timeline, filtered_df, flow_by)
+                cycle_df = flow_metrics.cycle_times(snapshot.timeline, filtered_df, flow_by)
+            flow_col1, flow_col2 = st.columns(2)
+            with flow_col1:
+                st.markdown("Average days per ticket in each status")
+                st.dataframe(status_days, use_container_width=True, height=400)
+            with flow_col2:
+                st.markdown("Cycle and lead time of finished tickets")
+                st.dataframe(cycle_df, hide_index=True, use_container_width=True, height=400)
+
+            # Daily snapshots recorded by history.py, so this never waits on Jira
+            st.markdown("### Trends")
+            trend_days = {"3 months": 91, "6 months": 182, "12 months": 365}
+            trend_period = st.radio("Period", list(trend_days), horizontal=True, key="trend_period")
+            trend_start = date.today() - timedelta(days=trend_days[trend_period])
+            with metrics.timed("rerun.history"):
+                history_cells = history.load("component_status", trend_start)
+                history_aging = history.load("aging", trend_start)
+            if history_cells.empty:
+                st.info("No history yet; the first daily snapshot is recorded after the next sync.")
+            else:
+                with metrics.timed("rerun.aggregate"):
+                    open_trend = history.open_counts(history_cells, 'Component', query.project, query.component)
+                    # The components with the most open tickets today, as in the charts above
+                    if not open_trend.empty:
+                        open_trend = open_trend[open_trend.iloc[-1].nlargest(aggregations.CHART_COMPONENTS).index]
+                    aging_trend = history_aging[
+                        (history_aging['Project'] == (query.project or history.ALL))
+                        & (history_aging['Component'] == (query.component or history.ALL))
+                    ].set_index('Date')[list(history.PERCENTILES)]
+                with metrics.timed("rerun.figures"):
+                    open_fig = charts.trend_lines(open_trend, 'Open Tickets by Component', 'Open Tickets')
+                    aging_fig = charts.trend_lines(aging_trend, 'Age of Open Tickets (percentiles)', 'Days')
+                trend_col1, trend_col2 = st.columns(2)
+                with metrics.timed("rerun.charts"):
+                    with trend_col1:
+                        st.plotly_chart(open_fig, use_container_width=True)
+                    with trend_col2:
+                        st.plotly_chart(aging_fig, use_container_width=True)
+                if 'No Component' in open_trend:
+                    backlog = open_trend['No Component']
+                    st.caption(f"No Component backlog: {backlog.iloc[0]} on {backlog.index[0]:%Y-%m-%d}, "
+                               f"{backlog.iloc[-1]} on {backlog.index[-1]:%Y-%m-%d}")
 
             # Show additional metrics only when "All" components are selected
             if selected_component == "All":
                 # Status Distribution by Component
                 st.markdown("### Status Distribution by Component")
-                status_dist = px.bar(
-                    filtered_df,
-                    x='Component',
-                    color='Status',
-                    title='Work Items Distribution by Status',
-                    height=400,
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                status_dist.update_layout(
-                    xaxis=dict(
-                        title='Component',
-                        tickangle=45,
-                        tickfont=dict(size=12, color='#002e6e')
-                    ),
-                    yaxis=dict(
-                        title='Number of Work Items',
-                        tickfont=dict(size=12, color='#002e6e')
-                    ),
-                    plot_bgcolor='white',
-                    paper_bgcolor='white',
-                    margin=dict(t=100, b=100)
-                )
-                st.plotly_chart(status_dist, use_container_width=True)
+                with metrics.timed("rerun.figures"):
+                    bar_counts = aggregations.top_components(summary['components'], summary['counts'])[1]
+                    status_dist = charts.status_bar(bar_counts)
+                with metrics.timed("rerun.charts"):
+                    st.plotly_chart(status_dist, use_container_width=True)
 
-                # Create clickable JIRA links using Streamlit's link format
-                filtered_df['JIRA Link'] = filtered_df.apply(
-                    lambda row: f"[{row['Key']}]({JIRA_URL}/browse/{row['Key']})",
-                    axis=1
-                )
-                
-                # Sort by created date in descending order
-                filtered_df = filtered_df.sort_values('Created', ascending=False)
-                
                 # Detailed View with proper heading
                 st.markdown("### Detailed Issue List")
-                st.markdown("Sorted by creation date (newest first)")
                 
-                # Reorder columns for better visibility
-                display_columns = [
-                    'JIRA Link', 'Issue Type', 'Assignee', 
-                    'Status', 'Component', 'Created', 'Aging (Days)', 'Summary'
-                ]
+                # Searched in-process over keys and summaries, so no query goes to Jira
+                search_text = st.text_input(
+                    "Search issues",
+                    placeholder="Words from the summary or a key, e.g. refund timeout or PGP-12",
+                    key="issue_search"
+                ).strip()
+                list_df = filtered_df
+                if search_text:
+                    with metrics.timed("rerun.search"):
+                        hits = search_index.search(snapshot.search, search_text)[0]
+                        list_df = query_cache.narrow(snapshot.frame, query, snapshot.components, hits)
+                
+                # Sorted and paged here, so only one page is sent to the browser
+                sort_col1, sort_col2, sort_col3 = st.columns([2, 1, 1])
+                with sort_col1:
+                    sort_by = st.selectbox(
+                        "Sort by",
+                        (["Relevance"] if search_text else [])
+                        + ["Created", "Aging (Days)", "Assignee", "Status", "Components", "Issue Type"],
+                        key="issue_sort"
+                    )
+                with sort_col2:
+                    descending = st.toggle("Descending", value=True, key="issue_descending")
+                page_count = max(1, -(-len(list_df) // report.PAGE_SIZE))
+                if st.session_state.get("issue_page", 1) > page_count:
+                    st.session_state.issue_page = page_count
+                with sort_col3:
+                    page_number = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="issue_page")
+                
+                # Browse links and summaries are built for the visible page only
+                with metrics.timed("rerun.links"):
+                    detail_df = report.issue_page(
+                        list_df, page_number - 1, None if sort_by == "Relevance" else sort_by, not descending,
+                        jira_url=JIRA_URL
+                    )
+                first_row = (page_number - 1) * report.PAGE_SIZE
+                matching = f" matching “{search_text}”" if search_text else ""
+                if list_df.empty:
+                    st.caption(f"No issues{matching}")
+                else:
+                    st.caption(f"Showing {first_row + 1:,}–{first_row + len(detail_df):,} of {len(list_df):,} issues{matching}")
                 
                 # Configure column widths and formatting
-                st.dataframe(
-                    filtered_df[display_columns],
-                    column_config={
-                        "JIRA Link": st.column_config.LinkColumn(
-                            "JIRA ID",
-                            width="small",
-                            help="Click to open in JIRA"
-                        ),
-                        "Issue Type": st.column_config.TextColumn(
-                            "Issue Type",
-                            width="small"
-                        ),
-                        "Assignee": st.column_config.TextColumn(
-                            "Assignee",
-                            width="small"
-                        ),
-                        "Status": st.column_config.TextColumn(
-                            "Status",
-                            width="small"
-                        ),
-                        "Component": st.column_config.TextColumn(
-                            "Component",
-                            width="small"
-                        ),
-                        "Created": st.column_config.TextColumn(
-                            "Created Date",
-                            width="small"
-                        ),
-                        "Aging (Days)": st.column_config.NumberColumn(
-                            "Aging (Days)",
-                            width="small",
-                            format="%d",
-                            help="Days since ticket creation"
-                        ),
-                        "Summary": st.column_config.TextColumn(
-                            "Summary",
-                            width="large",
-                            max_chars=100
-                        )
-                    },
-                    hide_index=True,
-                    use_container_width=True,
-                    height=400
-                )
+                with metrics.timed("rerun.tables"):
+                    st.dataframe(
+                        detail_df,
+                        column_config={
+                            "JIRA Link": st.column_config.LinkColumn(
+                                "JIRA ID",
+                                width="small",
+                                help="Click to open in JIRA",
+                                display_text=r"/browse/(.*)$"
+                            ),
+                            "Issue Type": st.column_config.TextColumn(
+                                "Issue Type",
+                                width="small"
+                            ),
+                            "Assignee": st.column_config.TextColumn(
+                                "Assignee",
+                                width="small"
+                            ),
+                            "Status": st.column_config.TextColumn(
+                                "Status",
+                                width="small"
+                            ),
+                            "Components": st.column_config.TextColumn(
+                                "Components",
+                                width="small"
+                            ),
+                            "Created": st.column_config.DateColumn(
+                                "Created Date",
+                                width="small",
+                                format="YYYY-MM-DD"
+                            ),
+                            "Aging (Days)": st.column_config.NumberColumn(
+                                "Aging (Days)",
+                                width="small",
+                                format="%d",
+                                help="Days since ticket creation"
+                            ),
+                            "Summary": st.column_config.TextColumn(
+                                "Summary",
+                                width="large",
+                                max_chars=100
+                            )
+                        },
+                        hide_index=True,
+                        use_container_width=True,
+                        height=400
+                    )
+
+            # Exports of the filtered issues and of the whole board
+            st.markdown("### Export")
+            export_controls("Filtered Issues", ("issues", query), f"issues_{report.slug(query)}", filtered_df,
+                            key="export_filtered")
+            export_controls("Full Board", "board", "board", lambda: snapshot.frame, key="export_board")
 
         except Exception as e:
             st.error(f"Error fetching JIRA data: {e}")
@@ -734,66 +828,15 @@ except Exception as e:
     st.error(f"Error fetching JIRA data: {e}")
     st.stop()
 
-def send_component_reminder_emails(df):
-    """Send reminder emails to assignees/reporters of tickets without components."""
-    if SMTP_USERNAME is None or SMTP_PASSWORD is None or SENDER_EMAIL is None:
-        st.error("Email configuration is missing. Please set SMTP_USERNAME, SMTP_PASSWORD, and SENDER_EMAIL in .env file.")
-        return False
-    
-    no_component_tickets = df[df['Component'] == 'No Component']
-    if no_component_tickets.empty:
-        st.info("No tickets found without components.")
-        return True
-    
-    try:
-        # Connect to SMTP server
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        
-        success_count = 0
-        for _, ticket in no_component_tickets.iterrows():
-            # Prepare email content
-            msg = MIMEMultipart()
-            msg['From'] = SENDER_EMAIL
-            msg['Subject'] = f"Action Required: Add Component to JIRA Ticket {ticket['Key']}"
-            
-            # Get assignee email (you might need to modify this based on your JIRA setup)
-            assignee_email = ticket.get('Assignee Email', '')
-            if not assignee_email:
-                continue
-            
-            msg['To'] = assignee_email
-            
-            # Create email body
-            body = f"""
-            Hello,
-
-            This is a reminder that the following JIRA ticket needs a component assigned:
-
-            Ticket: {ticket['Key']}
-            Summary: {ticket['Summary']}
-            Status: {ticket['Status']}
-            Created: {ticket['Created']}
-
-            Please add an appropriate component to this ticket at your earliest convenience.
-
-            You can access the ticket here: {JIRA_URL}/browse/{ticket['Key']}
-
-            Best regards,
-            PM Assist Bot
-            """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Send email
-            server.send_message(msg)
-            success_count += 1
-        
-        server.quit()
-        st.success(f"Successfully sent reminder emails for {success_count} tickets.")
-        return True
-        
-    except Exception as e:
-        st.error(f"Error sending emails: {str(e)}")
-        return False
+# Per-rerun breakdown, the last background sync and process-wide counters
+rerun_trace.finish()
+if show_timings:
+    with timings_slot:
+        st.markdown("**This rerun**")
+        timings_table(rerun_trace)
+        last_sync = metrics.last_traces.get("sync")
+        if last_sync is not None:
+            st.markdown("**Last sync**")
+            timings_table(last_sync)
+        counters = metrics.to_dict()["counters"]
+        st.caption(" | ".join(f"{name}: {value:,}" for name, value in sorted(counters.items())))
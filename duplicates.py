@@ -0,0 +1,231 @@
+import os
+import re
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import flow_metrics
+import metrics
+import report
+
+# Near-duplicate detection configuration
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.7"))   # estimated Jaccard similarity of summaries
+CLUSTERS_PER_PAGE = 20
+
+SHINGLE_BYTES = 4
+# 16 bands of 4 rows: summaries sharing half their shingles usually land in a
+# common bucket, and the threshold then filters the candidates
+BANDS, BAND_ROWS = 16, 4
+PERMUTATIONS = BANDS * BAND_ROWS
+_SEED = 20240611
+
+# `tickets` are the issues in a candidate cluster, newest cluster first, with
+# Cluster and Similarity (to the cluster's first summary); `clusters` has one
+# row per cluster
+Duplicates = namedtuple("Duplicates", ["tickets", "clusters"])
+
+_SPACE = re.compile(r"\W+")
+_signatures_lock = threading.Lock()
+_signature_rows = {}
+_signatures = np.empty((0, PERMUTATIONS), dtype=np.uint32)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def normalise(summary):
+    """Lower-cased words of a summary joined by single spaces."""
+    return _SPACE.sub(" ", summary.lower()).strip()
+
+
+def _shingles(texts):
+    # Every SHINGLE_BYTES-byte window of each text as one uint32, with each
+    # text's first window; windows never cross into the next text
+    encoded = [text.encode().ljust(SHINGLE_BYTES) for text in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+    windows = data[:len(data) - SHINGLE_BYTES + 1] << 24
+    for offset in range(1, SHINGLE_BYTES):
+        windows |= data[offset:len(data) - SHINGLE_BYTES + 1 + offset] << (24 - 8 * offset)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    counts = lengths - SHINGLE_BYTES + 1
+    keep = np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return windows[keep], np.cumsum(counts) - counts
+
+
+def minhash(texts):
+    """MinHash signatures (one uint32 row per text) of texts' byte shingles."""
+    if not texts:
+        return np.empty((0, PERMUTATIONS), dtype=np.uint32)
+    shingles, firsts = _shingles(texts)
+    shingles = shingles.astype(np.uint64)
+    random = np.random.default_rng(_SEED)
+    # Multiply-shift hashing: one odd multiplier and offset per permutation
+    multipliers = random.integers(1, 2 ** 63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    offsets = random.integers(0, 2 ** 63, PERMUTATIONS, dtype=np.uint64)
+    signatures = np.empty((len(texts), PERMUTATIONS), dtype=np.uint32)
+    for i in range(PERMUTATIONS):
+        hashed = (shingles * multipliers[i] + offsets[i]) >> np.uint64(32)
+        signatures[:, i] = np.minimum.reduceat(hashed, firsts)
+    return signatures
+
+
+def signatures_for(texts):
+    """Signatures of normalised texts, MinHashing only texts not seen before.
+
+    Kept between snapshots, so a new sync only hashes its new or edited
+    summaries; texts no longer asked for are dropped.
+    """
+    global _signature_rows, _signatures
+    with _signatures_lock:
+        new = [text for text in texts if text not in _signature_rows]
+        with metrics.timed("duplicates.minhash"):
+            fresh = minhash(new)
+        known = np.array([_signature_rows.get(text, -1) for text in texts], dtype=np.int64)
+        signatures = np.empty((len(texts), PERMUTATIONS), dtype=np.uint32)
+        signatures[known >= 0] = _signatures[known[known >= 0]]
+        signatures[known < 0] = fresh
+        _signature_rows = {text: row for row, text in enumerate(texts)}
+        _signatures = signatures
+        metrics.inc("duplicates_hashed", len(new))
+    return signatures
+
+
+def _candidate_pairs(signatures):
+    # Per band, each bucket's members paired with the bucket's first member
+    left, right = [], []
+    for band in range(BANDS):
+        columns = signatures[:, band * BAND_ROWS:(band + 1) * BAND_ROWS].astype(np.uint64)
+        keys = np.zeros(len(signatures), dtype=np.uint64)
+        for column in range(BAND_ROWS):
+            keys = keys * np.uint64(0x9E3779B97F4A7C15) + columns[:, column]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bucket_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        first = np.repeat(order[bucket_starts], np.diff(np.r_[bucket_starts, len(order)]))
+        linked = first != order
+        left.append(first[linked])
+        right.append(order[linked])
+    return np.concatenate(left), np.concatenate(right)
+
+
+def _components(count, left, right):
+    # Connected components; each text is labelled with its component's smallest member
+    labels = np.arange(count)
+    while True:
+        previous = labels
+        low = np.minimum(labels[left], labels[right])
+        labels = labels.copy()
+        np.minimum.at(labels, left, low)
+        np.minimum.at(labels, right, low)
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def find_duplicates(frame, threshold=DUPLICATE_THRESHOLD):
+    """Group issues whose summaries are near duplicates.
+
+    Identical summaries (after normalising) always group; others group
+    when MinHash estimates their shingle Jaccard similarity at `threshold`
+    or more. Candidates come from LSH buckets, so this is roughly linear in
+    the number of distinct summaries rather than quadratic.
+    """
+    summaries = frame['Summary'].fillna("").map(normalise)
+    codes, texts = pd.factorize(summaries)
+    texts = list(texts)
+    signatures = signatures_for(texts)
+
+    with metrics.timed("duplicates.cluster"):
+        left, right = _candidate_pairs(signatures)
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        # Issues without a summary are never duplicates of anything
+        empty = np.array([not text for text in texts], dtype=bool)
+        similar = (similarity >= threshold) & ~empty[left] & ~empty[right]
+        labels = _components(len(texts), left[similar], right[similar])
+        labels[empty] = -1
+
+        text_similarity = (signatures == signatures[np.maximum(labels, 0)]).mean(axis=1)
+        tickets = frame.assign(Cluster=labels[codes], Similarity=text_similarity[codes].round(2))
+        tickets = tickets[tickets['Cluster'] >= 0]
+        sizes = tickets.groupby('Cluster')['Key'].transform('size')
+        tickets = tickets[sizes > 1]
+
+        tickets = tickets.assign(Open=~tickets['Status'].isin(flow_metrics.DONE_STATUSES))
+        clusters = tickets.groupby('Cluster').agg(
+            Tickets=('Key', 'size'),
+            Open=('Open', 'sum'),
+            Newest=('Created', 'max'),
+            Summary=('Summary', 'first'),
+        ).sort_values('Newest', ascending=False, kind='stable')
+        # Numbered newest first, the order the view lists them in
+        number = pd.Series(np.arange(1, len(clusters) + 1), index=clusters.index)
+        tickets = tickets.assign(Cluster=tickets['Cluster'].map(number)).sort_values(
+            ['Cluster', 'Similarity', 'Created'], ascending=[True, False, False], kind='stable'
+        )
+        clusters = clusters.reset_index(drop=True).rename_axis('Cluster')
+        clusters.index += 1
+    return Duplicates(tickets.reset_index(drop=True), clusters.reset_index())
+
+
+def duplicates_for(snapshot):
+    """Candidate duplicates for a snapshot, computed once per data version."""
+    with _cache_lock:
+        cached = _cache.get(snapshot.version)
+    if cached is None:
+        cached = find_duplicates(snapshot.frame)
+        with _cache_lock:
+            _cache.clear()
+            _cache[snapshot.version] = cached
+    return cached
+
+
+def render(snapshot, jira_url=report.JIRA_URL):
+    """Draw the Duplicate Tickets page from the published snapshot."""
+    with metrics.timed("rerun.duplicates"):
+        duplicates = duplicates_for(snapshot)
+
+    open_only = st.toggle("Only clusters with two or more open tickets", value=True, key="duplicates_open_only")
+    clusters = duplicates.clusters
+    if open_only:
+        clusters = clusters[clusters['Open'] >= 2]
+    if clusters.empty:
+        st.info(f"No near-duplicate summaries found (similarity threshold {DUPLICATE_THRESHOLD:.0%}).")
+        return
+
+    st.markdown("### Key Metrics")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Candidate Clusters", len(clusters))
+    with col2:
+        st.metric("Tickets in Clusters", int(clusters['Tickets'].sum()))
+    with col3:
+        st.metric("Open Tickets in Clusters", int(clusters['Open'].sum()))
+
+    st.markdown("### Candidate Duplicates")
+    st.markdown("Newest clusters first; similarity is to the cluster's first summary")
+    page_count = max(1, -(-len(clusters) // CLUSTERS_PER_PAGE))
+    if st.session_state.get("duplicates_page", 1) > page_count:
+        st.session_state.duplicates_page = page_count
+    page_number = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="duplicates_page")
+    first = (page_number - 1) * CLUSTERS_PER_PAGE
+    shown = clusters.iloc[first:first + CLUSTERS_PER_PAGE]
+    st.caption(f"Showing clusters {first + 1:,}–{first + len(shown):,} of {len(clusters):,}")
+
+    tickets = duplicates.tickets[duplicates.tickets['Cluster'].isin(shown['Cluster'])]
+    tickets = tickets.assign(**{'JIRA Link': f"{jira_url}/browse/" + tickets['Key']})
+    st.dataframe(
+        tickets[['Cluster', 'JIRA Link', 'Summary', 'Similarity', 'Status', 'Assignee', 'Project', 'Created']],
+        column_config={
+            "JIRA Link": st.column_config.LinkColumn("JIRA ID", width="small", display_text=r"/browse/(.*)$"),
+            "Summary": st.column_config.TextColumn("Summary", width="large", max_chars=100),
+            "Similarity": st.column_config.NumberColumn("Similarity", format="%.2f"),
+            "Created": st.column_config.DateColumn("Created Date", format="YYYY-MM-DD"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import metrics
+
+# Export configuration
+EXPORT_DIR = os.getenv("EXPORT_DIR", "data/exports")
+EXPORT_CACHE_ENTRIES = int(os.getenv("EXPORT_CACHE_ENTRIES", "16"))   # files kept for all sessions
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))      # rows encoded at a time
+
+# Extension and MIME type of each export format
+FORMATS = {
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# A finished export file; `file_name` is what the browser saves it as
+Export = namedtuple("Export", ["path", "file_name", "mime", "rows"])
+
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_files = OrderedDict()
+
+
+def _chunks(frame, chunk_rows):
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def write_csv_gz(frame, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write `frame` as gzipped CSV, encoding `chunk_rows` rows at a time."""
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        for number, chunk in enumerate(_chunks(frame, chunk_rows)):
+            chunk.to_csv(f, header=number == 0, index=False)
+        if frame.empty:
+            frame.to_csv(f, index=False)
+
+
+def write_parquet(frame, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write `frame` as Parquet with one row group per `chunk_rows` rows."""
+    # pyarrow is only needed once someone asks for Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(frame, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS = {"csv.gz": write_csv_gz, "parquet": write_parquet}
+
+
+def _key_path(version, view, fmt):
+    digest = hashlib.sha1(repr((version, view)).encode()).hexdigest()[:16]
+    return os.path.join(EXPORT_DIR, f"{version}-{digest}.{fmt}")
+
+
+def cached(version, view, fmt):
+    """The finished export of this data version, view and format, or None."""
+    with _lock:
+        export = _files.get((version, view, fmt))
+        if export is not None:
+            _files.move_to_end((version, view, fmt))
+    if export is not None and os.path.exists(export.path):
+        return export
+    return None
+
+
+def export(version, view, name, frame, fmt):
+    """Write `frame` as `fmt` unless this version/view/format is already on disk.
+
+    `view` identifies the rows exported, e.g. a query_cache.Query, and may
+    be any hashable with a stable repr; `name` only names the downloaded
+    file. `frame` may be a callable so the rows are only gathered on a miss.
+    Files are shared by every session and the oldest are removed once more
+    than EXPORT_CACHE_ENTRIES exist.
+    """
+    key = (version, view, fmt)
+    # One writer at a time, so two sessions asking for the same file write it once
+    with _write_lock:
+        export = cached(version, view, fmt)
+        if export is not None:
+            metrics.inc("export_cache_hits")
+            return export
+        if callable(frame):
+            frame = frame()
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = _key_path(version, view, fmt)
+        temporary = f"{path}.tmp"
+        with metrics.timed(f"export.{fmt}"):
+            WRITERS[fmt](frame, temporary)
+        os.replace(temporary, path)
+        metrics.inc("exports_written")
+        export = Export(path, f"{name}.{fmt}", FORMATS[fmt], len(frame))
+
+        with _lock:
+            _files[key] = export
+            evicted = []
+            while len(_files) > EXPORT_CACHE_ENTRIES:
+                evicted.append(_files.popitem(last=False)[1])
+        for old in evicted:
+            try:
+                os.remove(old.path)
+            except FileNotFoundError:
+                pass
+        return export
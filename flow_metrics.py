@@ -0,0 +1,115 @@
+import os
+
+import pandas as pd
+
+# Statuses that mark work as started and as finished, for cycle and lead time
+START_STATUSES = [s.strip() for s in os.getenv("FLOW_START_STATUSES", "In Progress").split(",")]
+DONE_STATUSES = [s.strip() for s in os.getenv("FLOW_DONE_STATUSES", "Done,Closed,Resolved").split(",")]
+
+DAY = pd.Timedelta(days=1)
+
+
+def _with_groups(timeline, frame, by):
+    """The timeline rows of `frame`'s issues, with each issue's `by` value as Group.
+
+    Keys are mapped once per category rather than once per row.
+    """
+    per_key = frame.drop_duplicates('Key').set_index('Key')[by]
+    keys = timeline['Key']
+    per_category = per_key.reindex(keys.cat.categories).to_numpy()
+    groups = pd.Series(per_category[keys.cat.codes], index=timeline.index)
+    in_frame = groups.notna() & (keys.cat.codes >= 0)
+    return timeline[in_frame].assign(Group=groups[in_frame])
+
+
+def status_intervals(timeline, now=None):
+    """Each stay of an issue in a status, with its length in days.
+
+    A stay lasts until the issue's next transition; the current one runs to
+    `now`. Relies on the timeline being sorted by Key then Entered.
+    """
+    now = now or pd.Timestamp.now(tz='UTC')
+    key = timeline['Key'].cat.codes
+    left = timeline['Entered'].shift(-1).where(key.shift(-1) == key, now)
+    return pd.DataFrame({
+        'Key': timeline['Key'],
+        'Status': timeline['Status'],
+        'Days': (left - timeline['Entered']) / DAY,
+    })
+
+
+def current_stay(timeline, now=None):
+    """Days each issue has been in its current status, indexed by key."""
+    now = now or pd.Timestamp.now(tz='UTC')
+    current = timeline[~timeline['Key'].cat.codes.duplicated(keep='last')]
+    return pd.Series(((now - current['Entered']) / DAY).to_numpy(), index=current['Key'].astype(str).to_numpy())
+
+
+def days_in(timeline, statuses, now=None):
+    """Total days each issue has spent in any of `statuses`, indexed by key.
+
+    Issues that never entered one of them are left out.
+    """
+    intervals = status_intervals(timeline, now)
+    intervals = intervals[intervals['Status'].isin(statuses)]
+    totals = intervals.groupby(intervals['Key'].cat.codes)['Days'].sum()
+    return pd.Series(totals.to_numpy(), index=timeline['Key'].cat.categories[totals.index].astype(str))
+
+
+def time_in_status(timeline, frame, by='Component', now=None):
+    """Average days a ticket of each group has spent in each status.
+
+    Rows are the values of `by` (a column of the issue frame), columns are
+    statuses ordered by total time spent, largest first. Time after a
+    ticket is done says nothing about where work waits, so DONE_STATUSES
+    are left out.
+    """
+    timeline = _with_groups(timeline, frame, by)
+    intervals = status_intervals(timeline, now).assign(Group=timeline['Group'])
+    intervals = intervals[~intervals['Status'].isin(DONE_STATUSES)]
+    totals = intervals.groupby(['Group', 'Status'], observed=True)['Days'].sum()
+    table = totals.unstack(fill_value=0.0)
+    table = table[table.sum().sort_values(ascending=False).index]
+    tickets = frame.groupby(by, observed=True).size()
+    table = table.div(tickets.reindex(table.index).to_numpy(), axis=0).round(1)
+    table.index.name = by
+    table.columns = table.columns.astype(str)
+    return table
+
+
+def cycle_times(timeline, frame, by='Component'):
+    """Cycle and lead time of finished tickets, summarised per group.
+
+    Lead time runs from creation and cycle time from first entering a
+    START_STATUSES status, both to the last move into a DONE_STATUSES status.
+    Tickets reopened since are not counted as finished.
+    """
+    timeline = _with_groups(timeline, frame, by)
+    # Work on the integer key codes; the timeline is sorted by Key then Entered
+    key = timeline['Key'].cat.codes
+    entered = timeline['Entered']
+    status = timeline['Status']
+    first = ~key.duplicated()
+    last = ~key.duplicated(keep='last')
+
+    created = entered[first].set_axis(key[first])
+    group = timeline['Group'][first].set_axis(key[first])
+    is_done = status[last].isin(DONE_STATUSES).set_axis(key[last])
+    started = entered[status.isin(START_STATUSES)].groupby(key).min()
+    done = entered[status.isin(DONE_STATUSES)].groupby(key).max()
+    done = done[is_done.reindex(done.index).to_numpy()]
+
+    finished = pd.DataFrame({
+        'Lead': (done - created.reindex(done.index)) / DAY,
+        'Cycle': (done - started.reindex(done.index)) / DAY,
+        by: group.reindex(done.index),
+    })
+    grouped = finished.groupby(by, observed=True)
+    summary = pd.DataFrame({
+        'Done Tickets': grouped.size(),
+        'Cycle p50 (Days)': grouped['Cycle'].median(),
+        'Cycle p85 (Days)': grouped['Cycle'].quantile(0.85),
+        'Lead p50 (Days)': grouped['Lead'].median(),
+        'Lead p85 (Days)': grouped['Lead'].quantile(0.85),
+    }).round(1)
+    return summary.sort_values('Done Tickets', ascending=False).reset_index()
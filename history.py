@@ -0,0 +1,255 @@
+import argparse
+import os
+import sys
+import threading
+from datetime import date
+from functools import lru_cache
+
+import pandas as pd
+
+import aggregations
+import component_index
+import flow_metrics
+import metrics
+
+# Daily snapshot history configuration
+HISTORY_DIR = os.getenv("HISTORY_DIR", os.path.join("data", "history"))
+# Set to false when a cron job runs `python history.py` instead
+HISTORY_IN_WORKER = os.getenv("HISTORY_IN_WORKER", "true").lower() == "true"
+
+TABLES = ("component_status", "assignee_status", "aging")
+# Stands for every component (aging) or every project in a table's rows
+ALL = "(All)"
+PERCENTILES = {"p50": 0.5, "p85": 0.85, "p95": 0.95}
+AGING_COLUMNS = ["Component", "Open"] + list(PERCENTILES) + ["Max"]
+# Columns of each table's rows, after the Date
+TABLE_COLUMNS = {
+    "component_status": ["Project", "Component", "Status", "Count"],
+    "assignee_status": ["Project", "Assignee", "Status", "Count"],
+    "aging": ["Project"] + AGING_COLUMNS,
+}
+
+_record_lock = threading.Lock()
+
+
+def aging_percentiles(frame):
+    """Age percentiles of the open tickets, per component and for ALL of them.
+
+    A ticket counts under each of its components.
+    """
+    open_issues = frame[~frame['Status'].isin(flow_metrics.DONE_STATUSES)]
+    if open_issues.empty:
+        return pd.DataFrame(columns=AGING_COLUMNS)
+    ages = pd.DataFrame({
+        'Set': open_issues['Components'].cat.codes.to_numpy(),
+        'Age': open_issues['Aging (Days)'].to_numpy(dtype=float),
+    })
+    credited = ages.merge(component_index.split_sets(open_issues['Components'].cat.categories), on='Set')
+    groups = pd.concat([credited[['Component', 'Age']], ages[['Age']].assign(Component=ALL)])
+    grouped = groups.groupby('Component')['Age']
+    table = grouped.quantile(list(PERCENTILES.values())).unstack()
+    table.columns = list(PERCENTILES)
+    table.insert(0, 'Open', grouped.size())
+    table['Max'] = grouped.max()
+    return table.round(1).reset_index()
+
+
+def snapshot_tables(frame):
+    """One day's history rows for an issue frame, as {table: DataFrame}.
+
+    - `component_status`: Project, Component, Status, Count (a ticket counts
+      under each of its components)
+    - `assignee_status`: Project, Assignee, Status, Count
+    - `aging`: Project, Component, Open, p50, p85, p95, Max of open
+      tickets' ages, with Component ALL for the whole project and Project
+      ALL for the whole board
+
+    Tables without rows (e.g. for an empty frame) are empty frames with
+    these columns.
+    """
+    tables = {table: [] for table in TABLES}
+    for project, issues in frame.groupby('Project', observed=True):
+        project = str(project)
+        cells = aggregations.component_cells(issues)
+        tables["component_status"].append(cells[['Component', 'Status', 'Count']].assign(Project=project))
+        people = issues.groupby(['Assignee', 'Status'], observed=True).size().reset_index(name='Count')
+        tables["assignee_status"].append(people.astype({'Assignee': str, 'Status': str}).assign(Project=project))
+        tables["aging"].append(aging_percentiles(issues).assign(Project=project))
+    tables["aging"].append(aging_percentiles(frame).assign(Project=ALL))
+    for table, parts in tables.items():
+        parts = [part for part in parts if not part.empty]
+        tables[table] = (pd.concat(parts, ignore_index=True)[TABLE_COLUMNS[table]] if parts
+                         else pd.DataFrame(columns=TABLE_COLUMNS[table]))
+    return tables
+
+
+def _month_dir(table, month):
+    return os.path.join(HISTORY_DIR, table, f"month={month}")
+
+
+def _write(rows, path):
+    temporary = f"{path}.tmp"
+    rows.to_parquet(temporary, index=False)
+    os.replace(temporary, path)
+
+
+def recorded(day=None):
+    """True if `day` (default today) is already in the history."""
+    day = day or date.today()
+    return all(
+        os.path.exists(os.path.join(_month_dir(table, f"{day:%Y-%m}"), f"date={day:%Y-%m-%d}.parquet"))
+        for table in TABLES
+    )
+
+
+def record(frame, day=None):
+    """Append `day`'s (default today's) snapshot of an issue frame to the history.
+
+    Each day is its own Parquet file; recording a day again replaces just
+    that day. Months before `day`'s are then compacted into one file each.
+    """
+    day = day or date.today()
+    with _record_lock, metrics.timed("history.record"):
+        for table, rows in snapshot_tables(frame).items():
+            directory = _month_dir(table, f"{day:%Y-%m}")
+            os.makedirs(directory, exist_ok=True)
+            rows.insert(0, 'Date', pd.Timestamp(day))
+            _write(rows, os.path.join(directory, f"date={day:%Y-%m-%d}.parquet"))
+            compact(table, before=f"{day:%Y-%m}")
+
+
+def record_if_due(frame):
+    """Record today's snapshot unless it is already in the history."""
+    if not recorded():
+        record(frame)
+
+
+def _day_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("date=") and name.endswith(".parquet"))
+
+
+def compact(table, before):
+    """Merge the daily files of each month before `before` (YYYY-MM) into one."""
+    root = os.path.join(HISTORY_DIR, table)
+    for month in sorted(os.listdir(root)):
+        directory = os.path.join(root, month)
+        days = _day_files(directory)
+        if month >= f"month={before}" or not days:
+            continue
+        merged = _read_month(directory, tuple(days))
+        _write(merged, os.path.join(directory, "month.parquet"))
+        for name in days:
+            os.remove(os.path.join(directory, name))
+
+
+@lru_cache(maxsize=1024)
+def _read(path, modified):
+    # Keyed on the modification time, so a replaced file is read again
+    return pd.read_parquet(path)
+
+
+def _read_month(directory, days):
+    frames = [_read(os.path.join(directory, name), os.stat(os.path.join(directory, name)).st_mtime_ns)
+              for name in days]
+    compacted = os.path.join(directory, "month.parquet")
+    if os.path.exists(compacted):
+        # Days recorded again after compaction replace their compacted rows
+        month = _read(compacted, os.stat(compacted).st_mtime_ns)
+        replaced = pd.to_datetime([name[len("date="):-len(".parquet")] for name in days])
+        frames.insert(0, month[~month['Date'].isin(replaced)] if days else month)
+    # Days recorded from an empty frame have no rows to add
+    frames = [rows for rows in frames if not rows.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _partitions(table, start, end):
+    """(month directory, day file names) of the partitions from `start` to `end`."""
+    root = os.path.join(HISTORY_DIR, table)
+    if not os.path.isdir(root):
+        return []
+    # Partition names sort by date; "~" sorts after every digit
+    first_month, last_month = f"month={start:%Y-%m}" if start else "", f"month={end:%Y-%m}" if end else "~"
+    first_day, last_day = f"date={start:%Y-%m-%d}" if start else "", f"date={end:%Y-%m-%d}.parquet" if end else "~"
+    partitions = []
+    for month in sorted(os.listdir(root)):
+        if first_month <= month <= last_month:
+            directory = os.path.join(root, month)
+            partitions.append((directory, tuple(name for name in _day_files(directory) if first_day <= name <= last_day)))
+    return partitions
+
+
+def _modified(partitions):
+    # Every file a load reads, with its modification time
+    for directory, days in partitions:
+        for name in ("month.parquet",) + days:
+            try:
+                yield name, os.stat(os.path.join(directory, name)).st_mtime_ns
+            except FileNotFoundError:
+                pass
+
+
+@lru_cache(maxsize=16)
+def _load(table, start, end, partitions, modified):
+    frames = []
+    for directory, days in partitions:
+        rows = _read_month(directory, days)
+        if rows.empty:
+            continue
+        if start is not None:
+            rows = rows[rows['Date'] >= pd.Timestamp(start)] if rows['Date'].min() < pd.Timestamp(start) else rows
+        if end is not None:
+            rows = rows[rows['Date'] <= pd.Timestamp(end)] if rows['Date'].max() > pd.Timestamp(end) else rows
+        frames.append(rows)
+    if not frames:
+        return pd.DataFrame(columns=['Date'] + TABLE_COLUMNS[table])
+    rows = pd.concat(frames, ignore_index=True)
+    if not rows['Date'].is_monotonic_increasing:
+        # A day recorded again after its month was compacted
+        rows = rows.sort_values('Date', kind='stable', ignore_index=True)
+    # Labels repeat every day, so categories make the loaded range small and quick to group
+    return rows.astype({column: 'category' for column in rows.columns if rows[column].dtype == object})
+
+
+def load(table, start=None, end=None):
+    """Rows of a history table dated `start` to `end` (inclusive), oldest first.
+
+    Only the month partitions overlapping the range are opened, and a range
+    whose files haven't changed since it was last loaded is served from
+    memory; callers must not modify the returned frame. Without rows it is
+    an empty frame with the table's columns.
+    """
+    with metrics.timed("history.load"):
+        partitions = tuple(_partitions(table, start, end))
+        return _load(table, start, end, partitions, tuple(_modified(partitions)))
+
+
+def open_counts(rows, by, project=None, component=None):
+    """Open tickets per day and `by` value (Component or Assignee), one column per value."""
+    if project is not None:
+        rows = rows[rows['Project'] == project]
+    if component is not None:
+        rows = rows[rows['Component'] == component]
+    rows = rows[~rows['Status'].isin(flow_metrics.DONE_STATUSES)]
+    counts = rows.groupby(['Date', by], observed=True)['Count'].sum().unstack(fill_value=0)
+    counts.columns = counts.columns.astype(str)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append today's snapshot to the Parquet history (for cron).")
+    parser.add_argument("--store", help="issue store to read (default: ISSUE_STORE_PATH)")
+    parser.add_argument("--date", type=date.fromisoformat, help="record under this date (default: today)")
+    args = parser.parse_args(argv)
+
+    import issue_store
+    store = args.store or issue_store.STORE_PATH
+    if issue_store.last_synced_at(store) is None:
+        print(f"No issues in {store}; sync it first.", file=sys.stderr)
+        return 1
+    record(issue_store.load_frame(path=store), args.date)
+    print(f"Recorded {args.date or date.today()} in {HISTORY_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,605 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import component_index
+import jira_fetch
+import metrics
+
+# Local issue store configuration
+STORE_PATH = os.getenv("ISSUE_STORE_PATH", os.path.join("data", "issues.sqlite3"))
+SYNC_INTERVAL_SECONDS = int(os.getenv("ISSUE_SYNC_INTERVAL", "60"))
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("ISSUE_RECONCILE_INTERVAL", "3600"))
+# Jira only filters `updated` to the minute, so re-read a small overlap each sync
+SYNC_OVERLAP_MINUTES = 5
+
+# Projects synced into the store, as "KEY" or "KEY: base JQL" entries separated
+# by ";" (a bare key syncs `project = KEY`). Each is its own partition of the
+# store, so an issue should match only one project's JQL, and may not carry an
+# ORDER BY (syncs add their own).
+PROJECTS_CONFIG = os.getenv("JIRA_PROJECTS", "PGP: project = PGP AND status not in (Queue)")
+# Projects synced at the same time; they share the gateway's connection pool and rate limit
+SYNC_CONCURRENCY = int(os.getenv("SYNC_PROJECT_CONCURRENCY", "4"))
+# The only fields the store keeps; customfield_21928 is Task Category
+FIELDS = ["summary", "components", "status", "assignee", "created", "updated",
+          "issuetype", "priority", "customfield_21928"]
+
+# Issue frame schema shared by every builder and view: low-cardinality text
+# as categories, Created as datetime64 (midnight) and aging as a small int.
+# Component is an issue's first component and Components all of them (see
+# component_index).
+FRAME_COLUMNS = ["Key", "Project", "Summary", "Component", "Components", "Status", "Assignee", "Created",
+                 "Issue Type", "Priority", "Task Category", "Aging (Days)"]
+CATEGORY_COLUMNS = ["Project", "Component", "Components", "Status", "Assignee", "Issue Type", "Priority", "Task Category"]
+AGING_DTYPE = "int16"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    summary TEXT,
+    components TEXT NOT NULL,
+    status TEXT,
+    assignee TEXT,
+    assignee_id TEXT,
+    created TEXT,
+    updated TEXT,
+    issue_type TEXT,
+    priority TEXT,
+    task_category TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_project_created ON issues (project, created);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    high_water TEXT,
+    last_sync REAL,
+    last_reconcile REAL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS status_events (
+    key TEXT NOT NULL,
+    changed_at REAL NOT NULL,
+    from_status TEXT,
+    to_status TEXT NOT NULL,
+    PRIMARY KEY (key, changed_at, to_status)
+) WITHOUT ROWID;
+"""
+
+# Columns added after the first release, created on stores that predate them.
+# New issue columns are only filled by a sync, so adding one forces a full resync.
+_ADDED_COLUMNS = {
+    "sync_state": [("version", "INTEGER NOT NULL DEFAULT 0")],
+    "issues": [("assignee_id", "TEXT")],
+}
+
+_COLUMNS = ["key", "project", "summary", "components", "status", "assignee",
+            "assignee_id", "created", "updated", "issue_type", "priority", "task_category"]
+
+# Re-fetched issues whose `updated` hasn't moved are left alone, so overlapping
+# syncs don't count as changes
+_UPSERT = (
+    f"INSERT INTO issues ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+    f"ON CONFLICT(key) DO UPDATE SET "
+    f"{', '.join(f'{name} = excluded.{name}' for name in _COLUMNS[1:])} "
+    f"WHERE issues.updated IS NOT excluded.updated"
+)
+
+_INSERT_EVENT = (
+    "INSERT OR IGNORE INTO status_events (key, changed_at, from_status, to_status) "
+    "VALUES (?, ?, ?, ?)"
+)
+
+# One sync at a time per process; every Streamlit session shares this module
+_sync_lock = threading.Lock()
+
+
+class SyncError(Exception):
+    """Raised when one or more projects failed to sync; the others were still synced."""
+
+
+_ORDER_BY = re.compile(r"\border\s+by\b", re.IGNORECASE)
+# `project = KEY` and `project in (KEY, ...)` clauses of a base JQL
+_PROJECT_CLAUSE = re.compile(r"\bproject\s*(?:=\s*\"?([\w-]+)\"?|in\s*\(([^)]*)\))", re.IGNORECASE)
+
+
+def parse_projects(config):
+    """Parse a JIRA_PROJECTS value into an ordered {project key: base JQL} dict.
+
+    Raises ValueError for JQL with an ORDER BY, which would break the
+    clauses and ordering appended to it.
+    """
+    projects = {}
+    for entry in config.split(";"):
+        # Only the first colon separates the key; JQL may contain more
+        key, _, jql = entry.partition(":")
+        if _ORDER_BY.search(jql):
+            raise ValueError(f"JIRA_PROJECTS: the JQL for {key.strip()} must not contain ORDER BY")
+        if key.strip():
+            projects[key.strip()] = jql.strip() or f"project = {key.strip()}"
+    return projects
+
+
+PROJECTS = parse_projects(PROJECTS_CONFIG)
+
+
+def base_jql(project=None):
+    """The base JQL of one project, or of every configured project when None.
+
+    Callers wrap it in parentheses before adding clauses.
+    """
+    if project is not None:
+        return PROJECTS[project]
+    if len(PROJECTS) == 1:
+        return next(iter(PROJECTS.values()))
+    return " OR ".join(f"({jql})" for jql in PROJECTS.values())
+
+
+def _projects(project):
+    return [project] if project is not None else list(PROJECTS)
+
+
+def connect(path=STORE_PATH):
+    """Open the store, creating the file and schema on first use."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    had_events = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'status_events'"
+    ).fetchone()
+    conn.executescript(_SCHEMA)
+    if not had_events:
+        # Stores that predate the event log need a full sync to backfill every changelog
+        with conn:
+            conn.execute("UPDATE sync_state SET high_water = NULL")
+    for table, columns in _ADDED_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, definition in columns:
+            if name not in existing:
+                with conn:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                    if table == "issues":
+                        conn.execute("UPDATE issues SET updated = NULL")
+                        conn.execute("UPDATE sync_state SET high_water = NULL")
+    return conn
+
+
+def _task_category(value):
+    if not value:
+        return 'Not Set'
+    if isinstance(value, dict):
+        return value.get('value') or value.get('name') or str(value)
+    return str(value)
+
+
+def issue_columns(raw_issues):
+    """Extract the stored columns from raw search JSON, one list per column.
+
+    Works straight on the `issues` array of a `json_result=True` search, so
+    no `Issue` resources are built.
+    """
+    keys = [issue["key"] for issue in raw_issues]
+    fields = [issue["fields"] for issue in raw_issues]
+    return {
+        "key": keys,
+        "project": [key.rsplit("-", 1)[0] for key in keys],
+        "summary": [f.get("summary") for f in fields],
+        "components": [json.dumps([c["name"] for c in f.get("components") or []]) for f in fields],
+        "status": [f["status"]["name"] for f in fields],
+        "assignee": [(f.get("assignee") or {}).get("displayName", "Unassigned") for f in fields],
+        # accountId on Jira Cloud, username on Server/Data Center
+        "assignee_id": [
+            (f.get("assignee") or {}).get("accountId") or (f.get("assignee") or {}).get("name")
+            for f in fields
+        ],
+        "created": [f["created"] for f in fields],
+        "updated": [f["updated"] for f in fields],
+        "issue_type": [f["issuetype"]["name"] for f in fields],
+        "priority": [(f.get("priority") or {}).get("name", "No Priority") for f in fields],
+        "task_category": [_task_category(f.get("customfield_21928")) for f in fields],
+    }
+
+
+def status_transitions(raw_issues):
+    """Extract status changes from the `changelog` of raw search JSON issues.
+
+    Returns (key, changed_at, from_status, to_status) rows, with changed_at
+    in epoch seconds.
+    """
+    rows = []
+    for issue in raw_issues:
+        for history in (issue.get("changelog") or {}).get("histories", []):
+            for item in history["items"]:
+                if item.get("field") == "status":
+                    changed_at = _parse_jira_time(history["created"]).timestamp()
+                    rows.append((issue["key"], changed_at, item.get("fromString"), item.get("toString")))
+    return rows
+
+
+def _complete_changelogs(jira, raw_issues):
+    """Re-read the few issues whose changelog the search response truncated."""
+    truncated = [
+        issue for issue in raw_issues
+        if (issue.get("changelog") or {}).get("total", 0) > len((issue.get("changelog") or {}).get("histories", []))
+    ]
+    histories = jira_fetch.fetch_changelogs(jira, [issue["key"] for issue in truncated])
+    for issue in truncated:
+        issue["changelog"] = {"startAt": 0, "total": len(histories[issue["key"]]), "histories": histories[issue["key"]]}
+
+
+def _parse_jira_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+def _get_state(conn, project):
+    row = conn.execute(
+        "SELECT high_water, last_sync, last_reconcile FROM sync_state WHERE project = ?",
+        (project,)
+    ).fetchone()
+    return row if row else (None, 0.0, 0.0)
+
+
+def _bump_version(conn, project):
+    conn.execute("UPDATE sync_state SET version = version + 1 WHERE project = ?", (project,))
+
+
+def data_version(path=STORE_PATH):
+    """Return a number that changes whenever stored issues are added, changed or removed."""
+    conn = connect(path)
+    try:
+        return conn.execute("SELECT COALESCE(SUM(version), 0) FROM sync_state").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def sync(jira, project, path=STORE_PATH):
+    """Fetch a project's issues updated since its high-water mark and upsert them.
+
+    The same search expands each issue's changelog, so status transitions
+    are only downloaded for issues that changed and are appended to the
+    event log. Returns the number of issues added or changed.
+    """
+    conn = connect(path)
+    try:
+        high_water, _, _ = _get_state(conn, project)
+        # Parenthesised, so a base JQL with OR can't swallow the clauses added here
+        jql = f"({base_jql(project)})"
+        if high_water:
+            since = _parse_jira_time(high_water) - timedelta(minutes=SYNC_OVERLAP_MINUTES)
+            jql += f' AND updated >= "{since:%Y/%m/%d %H:%M}"'
+        jql += ' ORDER BY key ASC'
+
+        columns = {name: [] for name in _COLUMNS}
+        events = []
+        pages = jira_fetch.iter_pages(jira, jql, fields=FIELDS, expand="changelog", raw=True)
+        for page in metrics.timed_iter(pages, "sync.search"):
+            with metrics.timed("sync.changelog"):
+                _complete_changelogs(jira, page)
+            with metrics.timed("sync.extract"):
+                for name, values in issue_columns(page).items():
+                    columns[name].extend(values)
+                events.extend(status_transitions(page))
+        # Partition by the configured project, whatever the issue key's prefix
+        columns["project"] = [project] * len(columns["key"])
+        rows = list(zip(*(columns[name] for name in _COLUMNS)))
+
+        if rows:
+            latest = max(columns["updated"], key=_parse_jira_time)
+            if not high_water or _parse_jira_time(latest) > _parse_jira_time(high_water):
+                high_water = latest
+
+        with metrics.timed("sync.write"), conn:
+            changes_before = conn.total_changes
+            conn.executemany(_UPSERT, rows)
+            changed = conn.total_changes - changes_before
+            # A fetched changelog is complete, so it replaces the issue's stored
+            # transitions, including any pushed earlier by webhooks
+            events_before = conn.total_changes
+            conn.executemany("DELETE FROM status_events WHERE key = ?", [(key,) for key in columns["key"]])
+            removed_events = conn.total_changes - events_before
+            conn.executemany(_INSERT_EVENT, events)
+            # Net new transitions: inserted minus replaced
+            new_events = (conn.total_changes - events_before - removed_events) - removed_events
+            conn.execute(
+                "INSERT INTO sync_state (project, high_water, last_sync, last_reconcile) "
+                "VALUES (?, ?, ?, 0) ON CONFLICT(project) DO UPDATE SET "
+                "high_water = excluded.high_water, last_sync = excluded.last_sync",
+                (project, high_water, time.time())
+            )
+            if changed or new_events:
+                _bump_version(conn, project)
+        metrics.inc("issues_changed", changed)
+        metrics.inc("status_events_added", max(new_events, 0))
+        return changed
+    finally:
+        conn.close()
+
+
+def reconcile(jira, project, path=STORE_PATH):
+    """Drop a project's stored issues that no longer match its base JQL (deleted, moved or queued).
+
+    Returns the number of issues removed.
+    """
+    live_keys = {
+        issue["key"]
+        for page in jira_fetch.iter_pages(jira, f"({base_jql(project)}) ORDER BY key ASC", fields="updated", raw=True)
+        for issue in page
+    }
+    conn = connect(path)
+    try:
+        stored_keys = {row[0] for row in conn.execute(
+            "SELECT key FROM issues WHERE project = ?", (project,)
+        )}
+        stale = sorted(stored_keys - live_keys)
+        with conn:
+            conn.executemany("DELETE FROM issues WHERE key = ?", [(key,) for key in stale])
+            conn.executemany("DELETE FROM status_events WHERE key = ?", [(key,) for key in stale])
+            conn.execute(
+                "UPDATE sync_state SET last_reconcile = ? WHERE project = ?",
+                (time.time(), project)
+            )
+            if stale:
+                _bump_version(conn, project)
+        return len(stale)
+    finally:
+        conn.close()
+
+
+def jql_projects(jql):
+    """The Jira project keys a base JQL names in `project =` or `project in` clauses, upper-cased."""
+    keys = set()
+    for single, listed in _PROJECT_CLAUSE.findall(jql):
+        keys.update(key.strip().strip('"').upper() for key in (single or listed).split(",") if key.strip())
+    return keys
+
+
+def project_of(key, jira_project=None):
+    """The configured project an issue is stored under, or None.
+
+    `jira_project` is the issue's Jira project key (default: the key's
+    prefix). It belongs to the configured project of that name or whose
+    base JQL names it; issues of any other project are not synced.
+    """
+    jira_project = (jira_project or key.rsplit("-", 1)[0]).upper()
+    for project, jql in PROJECTS.items():
+        if jira_project == project.upper() or jira_project in jql_projects(jql):
+            return project
+    return None
+
+
+def apply_webhook(event, issue, changelog=None, timestamp=None, path=STORE_PATH):
+    """Apply one Jira issue webhook (`jira:issue_created/updated/deleted`) to the store.
+
+    Created and updated issues are upserted unless the stored copy is
+    newer (webhooks can arrive out of order), together with any status
+    change in `changelog`, timed at `timestamp` (epoch milliseconds).
+    Deleted issues are removed. Issues of projects no base JQL covers are
+    ignored (see `project_of`); other base JQL filters can't be checked
+    here, and the next reconcile drops issues that don't match them.
+    Returns True if stored data changed.
+    """
+    key = issue["key"]
+    conn = connect(path)
+    try:
+        with conn:
+            if event == "jira:issue_deleted":
+                stored = conn.execute("SELECT project FROM issues WHERE key = ?", (key,)).fetchone()
+                if stored is None:
+                    return False
+                conn.execute("DELETE FROM issues WHERE key = ?", (key,))
+                conn.execute("DELETE FROM status_events WHERE key = ?", (key,))
+                _bump_version(conn, stored[0])
+                return True
+
+            project = project_of(key, ((issue.get("fields") or {}).get("project") or {}).get("key"))
+            if project is None:
+                return False
+            columns = issue_columns([issue])
+            columns["project"] = [project]
+            changes_before = conn.total_changes
+            stored = conn.execute("SELECT updated FROM issues WHERE key = ?", (key,)).fetchone()
+            if not (stored and stored[0]) or _parse_jira_time(stored[0]) < _parse_jira_time(columns["updated"][0]):
+                conn.execute(_UPSERT, [columns[name][0] for name in _COLUMNS])
+            changed_at = timestamp / 1000 if timestamp else _parse_jira_time(columns["updated"][0]).timestamp()
+            conn.executemany(_INSERT_EVENT, [
+                (key, changed_at, item.get("fromString"), item.get("toString"))
+                for item in (changelog or {}).get("items", []) if item.get("field") == "status"
+            ])
+            if conn.total_changes == changes_before:
+                return False
+            # Make sure the project has a sync_state row to version
+            conn.execute("INSERT OR IGNORE INTO sync_state (project, last_sync, last_reconcile) VALUES (?, 0, 0)",
+                         (project,))
+            _bump_version(conn, project)
+            return True
+    finally:
+        conn.close()
+
+
+def _sync_project_if_due(jira, project, path, trace):
+    with metrics.attached(trace):
+        conn = connect(path)
+        try:
+            high_water, last_sync, last_reconcile = _get_state(conn, project)
+        finally:
+            conn.close()
+
+        now = time.time()
+        if not high_water or now - last_sync >= SYNC_INTERVAL_SECONDS:
+            sync(jira, project, path)
+        if now - last_reconcile >= RECONCILE_INTERVAL_SECONDS:
+            with metrics.timed("sync.reconcile"):
+                reconcile(jira, project, path)
+
+
+def sync_if_due(jira, path=STORE_PATH):
+    """Sync every configured project that is due, and reconcile them less often.
+
+    Projects are synced concurrently (at most SYNC_CONCURRENCY at a time)
+    through the one shared Jira client. A failing project doesn't stop the
+    others; SyncError is raised afterwards naming every project that failed.
+    """
+    with _sync_lock:
+        trace = metrics.current_trace()
+        with ThreadPoolExecutor(max_workers=max(1, min(SYNC_CONCURRENCY, len(PROJECTS)))) as pool:
+            futures = {
+                project: pool.submit(_sync_project_if_due, jira, project, path, trace)
+                for project in PROJECTS
+            }
+        failures = [f"{project}: {future.exception()}"
+                    for project, future in futures.items() if future.exception() is not None]
+        if failures:
+            raise SyncError("; ".join(failures))
+
+
+def last_synced_at(path=STORE_PATH, project=None):
+    """Return when `project` last synced, or None if it never has.
+
+    With no project, this is the least recent sync of the configured
+    projects that have synced, so the data is at least that fresh.
+    """
+    conn = connect(path)
+    try:
+        synced = [_get_state(conn, name)[1] for name in _projects(project)]
+    finally:
+        conn.close()
+    synced = [last_sync for last_sync in synced if last_sync]
+    return datetime.fromtimestamp(min(synced)) if synced else None
+
+
+def assignee_ids(keys, path=STORE_PATH):
+    """Map issue keys to their assignee's Jira user id (None when unassigned)."""
+    keys = list(keys)
+    conn = connect(path)
+    try:
+        ids = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            ids.update(conn.execute(
+                f"SELECT key, assignee_id FROM issues WHERE key IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+        return ids
+    finally:
+        conn.close()
+
+
+def load_frame(component=None, created_from=None, created_to=None, path=STORE_PATH, project=None):
+    """Read issues from the store into the dashboard's issue frame.
+
+    `project` reads one partition (default: every configured project);
+    `component` keeps only issues tagged with it (use "No Component" for
+    untagged issues); `created_from`/`created_to` are
+    inclusive dates.
+    """
+    params = _projects(project)
+    query = (
+        "SELECT key, project, summary, components, status, assignee, created, "
+        f"issue_type, priority, task_category FROM issues WHERE project IN ({', '.join('?' * len(params))})"
+    )
+    if created_from is not None:
+        query += " AND substr(created, 1, 10) >= ?"
+        params.append(str(created_from))
+    if created_to is not None:
+        query += " AND substr(created, 1, 10) <= ?"
+        params.append(str(created_to))
+    query += " ORDER BY updated DESC"
+
+    conn = connect(path)
+    try:
+        stored = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+    df = build_frame(stored)
+    if component is not None:
+        df = df[component_index.contains(df["Components"], component)].reset_index(drop=True)
+    return df
+
+
+def load_timeline(path=STORE_PATH, project=None):
+    """Read the status history of stored issues as a compact, ordered frame.
+
+    One row per status an issue entered: its creation (in the status it was
+    created in) followed by each stored transition. Key and Status are
+    categories and Entered is a UTC datetime64, sorted by Key then Entered.
+    `project` reads one partition (default: every configured project).
+    """
+    projects = _projects(project)
+    placeholders = ', '.join('?' * len(projects))
+    conn = connect(path)
+    try:
+        issues = pd.read_sql_query(
+            f"SELECT key, created, status FROM issues WHERE project IN ({placeholders})", conn, params=projects
+        )
+        events = pd.read_sql_query(
+            "SELECT e.key, e.changed_at, e.from_status, e.to_status FROM status_events e "
+            f"JOIN issues i ON i.key = e.key WHERE i.project IN ({placeholders}) ORDER BY e.key, e.changed_at",
+            conn, params=projects
+        )
+    finally:
+        conn.close()
+
+    # An issue was created in the status its first transition left (or the one it's still in)
+    first_status = events.groupby("key", sort=False)["from_status"].first()
+    initial = issues["key"].map(first_status).fillna(issues["status"])
+    timeline = pd.DataFrame({
+        "Key": pd.concat([issues["key"], events["key"]], ignore_index=True),
+        "Status": pd.concat([initial, events["to_status"]], ignore_index=True),
+        "Entered": pd.concat([
+            pd.to_datetime(issues["created"], format="%Y-%m-%dT%H:%M:%S.%f%z", utc=True),
+            pd.to_datetime(events["changed_at"], unit="s", utc=True),
+        ], ignore_index=True),
+    })
+    timeline = timeline.sort_values(["Key", "Entered"], kind="stable", ignore_index=True)
+    return timeline.astype({"Key": "category", "Status": "category"})
+
+
+def build_frame(columns, today=None):
+    """Build the typed issue frame from store columns.
+
+    `columns` is a DataFrame or dict of lists keyed like the store (as
+    returned by `issue_columns`).
+    """
+    if not isinstance(columns, pd.DataFrame):
+        columns = pd.DataFrame(columns)
+    today = pd.Timestamp(today or datetime.now().date())
+
+    # Decode each distinct component list once rather than once per issue
+    stored = pd.Categorical(columns["components"])
+    decoded = [json.loads(value) for value in stored.categories]
+    first_components = np.array([names[0] if names else "No Component" for names in decoded], dtype=object)
+    component_sets = np.array([
+        component_index.SEPARATOR.join(names) if names else "No Component" for names in decoded
+    ], dtype=object)
+    created = pd.to_datetime(columns["created"].str[:10], format="%Y-%m-%d")
+    return pd.DataFrame({
+        "Key": columns["key"],
+        "Project": columns["project"].astype("category"),
+        "Summary": columns["summary"],
+        "Component": pd.Categorical(first_components[stored.codes]),
+        "Components": pd.Categorical(component_sets[stored.codes]),
+        "Status": columns["status"].astype("category"),
+        "Assignee": columns["assignee"].astype("category"),
+        "Created": created,
+        "Issue Type": columns["issue_type"].astype("category"),
+        "Priority": columns["priority"].astype("category"),
+        "Task Category": columns["task_category"].astype("category"),
+        "Aging (Days)": aging_days(created, today)
+    }, columns=FRAME_COLUMNS)
+
+
+def aging_days(created, today=None):
+    """Whole days from each Created date to `today`, as the frame's small int."""
+    today = pd.Timestamp(today or datetime.now().date())
+    return (today - created).dt.days.astype(AGING_DTYPE)
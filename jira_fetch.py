@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+
+# Pagination configuration
+PAGE_SIZE = int(os.getenv("JIRA_PAGE_SIZE", "100"))
+MAX_CONCURRENT_PAGES = int(os.getenv("JIRA_FETCH_CONCURRENCY", "4"))
+
+
+class IncompleteFetchError(Exception):
+    """Raised when fewer distinct issues arrived than Jira reported as the total."""
+
+
+def _search_page(jira, jql, start_at, page_size, fields, expand):
+    # search_issues rewrites a fields list in place, so give each call its own
+    if isinstance(fields, (list, tuple)):
+        fields = list(fields)
+    return jira.search_issues(
+        jql,
+        startAt=start_at,
+        maxResults=page_size,
+        fields=fields,
+        expand=expand,
+        json_result=True
+    )
+
+
+def iter_pages(jira, jql, fields=None, expand=None, page_size=PAGE_SIZE,
+               max_workers=MAX_CONCURRENT_PAGES, raw=False):
+    """Yield every page of issues matching `jql`, fetching pages concurrently.
+
+    The first page is fetched on its own to learn `total` and the page size
+    Jira actually honours; the remaining `startAt` offsets are then fetched by
+    at most `max_workers` threads and yielded in arrival order. Pages are
+    lists of `Issue` resources, or of raw issue dicts when `raw` is true.
+
+    `jql` should have a stable ORDER BY (e.g. key) so pages don't shift
+    mid-fetch. Raises IncompleteFetchError if any issue was missed, after the
+    pages that did arrive have been yielded.
+    """
+    def convert(page):
+        metrics.inc("jira_issues_fetched", len(page["issues"]))
+        if raw:
+            return page["issues"]
+        # Imported here so raw-only callers (sync, batch reports) don't load the client
+        from jira.resources import Issue
+        return [Issue(jira._options, jira._session, raw=issue) for issue in page["issues"]]
+
+    first = _search_page(jira, jql, 0, page_size, fields, expand)
+    total = first["total"]
+    # Jira silently caps maxResults server-side; page by what it really returned
+    step = first.get("maxResults") or len(first["issues"]) or page_size
+    keys = {issue["key"] for issue in first["issues"]}
+    yield convert(first)
+
+    if total > step:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [
+                pool.submit(_search_page, jira, jql, start_at, step, fields, expand)
+                for start_at in range(step, total, step)
+            ]
+            for future in as_completed(futures):
+                page = future.result()
+                keys.update(issue["key"] for issue in page["issues"])
+                yield convert(page)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if len(keys) < total:
+        raise IncompleteFetchError(
+            f"Fetched {len(keys)} of {total} issues for: {jql}"
+        )
+
+
+def fetch_all(jira, jql, fields=None, expand=None, **kwargs):
+    """Return every issue matching `jql` as a single list."""
+    issues = []
+    for page in iter_pages(jira, jql, fields=fields, expand=expand, **kwargs):
+        issues.extend(page)
+    return issues
+
+
+def _changelog(jira, key, page_size):
+    # Every history of one issue, paging /issue/{key}/changelog
+    from jira import JIRAError
+
+    histories = []
+    try:
+        while True:
+            page = jira._get_json(f"issue/{key}/changelog", params={"startAt": len(histories), "maxResults": page_size})
+            values = page.get("values", [])
+            histories.extend(values)
+            if not values or page.get("isLast") or len(histories) >= page.get("total", 0):
+                return histories
+    except JIRAError as e:
+        if e.status_code != 404:
+            raise
+        # Server/Data Center before 9 has no changelog endpoint, but expands the whole changelog
+        return jira.issue(key, fields="status", expand="changelog").raw["changelog"]["histories"]
+
+
+def fetch_changelogs(jira, keys, page_size=PAGE_SIZE, max_workers=MAX_CONCURRENT_PAGES):
+    """Return the full changelog histories of each issue, as {key: histories}.
+
+    Search and issue responses cut changelogs off at 100 histories, so each
+    issue's changelog is paged through on its own; issues are fetched by at
+    most `max_workers` threads.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as pool:
+        histories = dict(zip(keys, pool.map(lambda key: _changelog(jira, key, page_size), keys)))
+    metrics.inc("jira_changelogs_completed", len(keys))
+    return histories
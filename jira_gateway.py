@@ -0,0 +1,140 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from dotenv import load_dotenv
+from jira import JIRA
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+
+# Load credentials
+load_dotenv()
+
+JIRA_URL = os.getenv("JIRA_URL")
+JIRA_EMAIL = os.getenv("JIRA_EMAIL")
+JIRA_TOKEN = os.getenv("JIRA_TOKEN")
+
+# Gateway configuration, shared by every session in the process
+REQUEST_TIMEOUT = int(os.getenv("JIRA_TIMEOUT", "30"))
+POOL_SIZE = int(os.getenv("JIRA_POOL_SIZE", "10"))
+RATE_LIMIT_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT", "5"))
+RATE_LIMIT_BURST = int(os.getenv("JIRA_RATE_BURST", "10"))
+MAX_RETRIES = int(os.getenv("JIRA_MAX_RETRIES", "5"))
+MAX_BACKOFF_SECONDS = 60
+RETRY_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire` blocks until a request may be sent."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold back every caller, e.g. after Jira has asked us to slow down."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before retrying a throttled response, with jitter."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = 0
+        # Spread retries out so waiting sessions don't all return at once
+        return min(MAX_BACKOFF_SECONDS, max(delay, 0)) + random.uniform(0, 1)
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, 2 ** attempt))
+
+
+class GatewayAdapter(HTTPAdapter):
+    """Pooled keep-alive adapter that rate limits and retries throttled requests."""
+
+    def __init__(self, limiter, max_retries=MAX_RETRIES):
+        self.limiter = limiter
+        self.throttle_retries = max_retries
+        super().__init__(
+            pool_connections=POOL_SIZE,
+            pool_maxsize=POOL_SIZE,
+            pool_block=True,
+            # urllib3 only retries failed connects; throttled responses are handled in send()
+            max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.5,
+                              respect_retry_after_header=False, raise_on_status=False)
+        )
+
+    def send(self, request, **kwargs):
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            started = time.perf_counter()
+            response = super().send(request, **kwargs)
+            metrics.observe("jira.request", time.perf_counter() - started)
+            metrics.inc("jira_requests")
+            if response.status_code not in RETRY_STATUSES or attempt >= self.throttle_retries:
+                # Streamed bodies aren't read here, so fall back to the declared length
+                received = (int(response.headers.get("Content-Length") or 0)
+                            if kwargs.get("stream") else len(response.content))
+                metrics.inc("jira_bytes_received", received)
+                return response
+            metrics.inc("jira_throttled")
+            delay = _retry_delay(response, attempt)
+            self.limiter.pause(delay)
+            response.close()
+            attempt += 1
+
+
+limiter = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+
+_client = None
+_current_user = None
+_client_lock = threading.Lock()
+
+
+def get_jira():
+    """Return the process-wide Jira client, connecting and authenticating once."""
+    global _client, _current_user
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            with metrics.timed("jira.connect"):
+                # Throttling is retried by GatewayAdapter, so switch off the client's own retries
+                client = JIRA(server=JIRA_URL, token_auth=(JIRA_TOKEN), timeout=REQUEST_TIMEOUT, max_retries=0)
+                adapter = GatewayAdapter(limiter)
+                client._session.mount("https://", adapter)
+                client._session.mount("http://", adapter)
+                _current_user = client.current_user()
+            _client = client
+    return _client
+
+
+def current_user():
+    """Return the user the shared client authenticated as."""
+    get_jira()
+    return _current_user
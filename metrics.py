@@ -0,0 +1,238 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Metrics export configuration
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))          # 0 disables the HTTP exporter
+METRICS_JSON_PATH = os.getenv("METRICS_JSON_PATH")         # unset disables the JSON file
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "500"))   # recent timings kept per phase
+QUANTILES = (0.5, 0.9, 0.99)
+PREFIX = "pm_assist"
+
+
+class RollingHistogram:
+    """Timings of one phase: quantiles over the last `window` observations,
+    plus a count and sum over the life of the process."""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._recent = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self._recent.append(seconds)
+        self.count += 1
+        self.sum += seconds
+
+    def summary(self):
+        recent = sorted(self._recent)
+        # Nearest-rank quantiles
+        quantiles = {
+            q: recent[max(0, math.ceil(q * len(recent)) - 1)] if recent else 0.0
+            for q in QUANTILES
+        }
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "quantiles": quantiles,
+            "max": recent[-1] if recent else 0.0,
+        }
+
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_local = threading.local()
+_exporter = None
+
+# The most recent finished trace of each kind, e.g. "rerun" and "sync"
+last_traces = {}
+
+
+class Trace:
+    """Phase timings and counter increments of one rerun or sync.
+
+    Creating a trace makes it the active one for the current thread, so
+    `timed` and `inc` calls made anywhere below it are attributed to it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.phases = {}
+        self.counts = {}
+        self.started = time.perf_counter()
+        self.seconds = None
+        _local.trace = self
+
+    def finish(self):
+        """Record the trace's total time and keep it as the latest of its kind."""
+        if getattr(_local, "trace", None) is self:
+            _local.trace = None
+        self.seconds = time.perf_counter() - self.started
+        # A sync worker pass that had nothing to do isn't worth reporting
+        if self.phases:
+            observe(self.name, self.seconds)
+            last_traces[self.name] = self
+        return self
+
+
+def _active_trace():
+    return getattr(_local, "trace", None)
+
+
+def current_trace():
+    """The trace active in this thread, for handing to worker threads."""
+    return _active_trace()
+
+
+@contextmanager
+def attached(trace):
+    """Attribute the enclosed block's timings and counts to `trace`.
+
+    For worker threads doing part of another thread's rerun or sync; does
+    nothing special when `trace` is None.
+    """
+    previous = _active_trace()
+    _local.trace = trace
+    try:
+        yield
+    finally:
+        _local.trace = previous
+
+
+def observe(phase, seconds):
+    with _lock:
+        histogram = _histograms.get(phase)
+        if histogram is None:
+            histogram = _histograms[phase] = RollingHistogram()
+        histogram.observe(seconds)
+
+
+def inc(name, amount=1):
+    """Add to a process-wide counter (and to the current thread's trace)."""
+    trace = _active_trace()
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+        # Worker threads may share a trace, so it is updated under the lock too
+        if trace is not None:
+            trace.counts[name] = trace.counts.get(name, 0) + amount
+
+
+@contextmanager
+def timed(phase):
+    """Time the enclosed block as `phase`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        observe(phase, elapsed)
+        trace = _active_trace()
+        if trace is not None:
+            with _lock:
+                trace.phases[phase] = trace.phases.get(phase, 0.0) + elapsed
+
+
+def timed_iter(iterable, phase):
+    """Yield from `iterable`, timing only the waits for each item as `phase`."""
+    iterator = iter(iterable)
+    while True:
+        with timed(phase):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def to_dict():
+    """Every counter and phase summary, as JSON-ready data."""
+    with _lock:
+        counters = dict(_counters)
+        phases = {phase: histogram.summary() for phase, histogram in _histograms.items()}
+    for summary in phases.values():
+        summary["quantiles"] = {str(q): value for q, value in summary["quantiles"].items()}
+    return {
+        "generated_at": time.time(),
+        "counters": counters,
+        "phases": phases,
+        "last": {
+            name: {"seconds": trace.seconds, "phases": trace.phases, "counts": trace.counts}
+            for name, trace in list(last_traces.items())
+        },
+    }
+
+
+def prometheus_text():
+    """Render the metrics in the Prometheus text exposition format.
+
+    Phase timings are exported as a summary: the quantiles cover the recent
+    window, while `_sum` and `_count` keep growing, as Prometheus expects.
+    """
+    with _lock:
+        counters = sorted(_counters.items())
+        phases = sorted((phase, histogram.summary()) for phase, histogram in _histograms.items())
+
+    lines = []
+    for name, value in counters:
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total {value}")
+    if phases:
+        metric = f"{PREFIX}_phase_seconds"
+        lines.append(f"# HELP {metric} Time spent in each phase of a dashboard rerun or sync.")
+        lines.append(f"# TYPE {metric} summary")
+        for phase, summary in phases:
+            for q, value in summary["quantiles"].items():
+                lines.append(f'{metric}{{phase="{phase}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{metric}_sum{{phase="{phase}"}} {summary["sum"]:.6f}')
+            lines.append(f'{metric}_count{{phase="{phase}"}} {summary["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_json(path=METRICS_JSON_PATH):
+    """Replace `path` with the current metrics; does nothing when no path is set."""
+    if not path:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(to_dict(), f, indent=2)
+    os.replace(temporary, path)
+
+
+class _ExporterHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = prometheus_text(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(to_dict()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_exporter(port=METRICS_PORT):
+    """Serve /metrics and /metrics.json on `port` once per process (0 disables it)."""
+    global _exporter
+    if not port:
+        return
+    with _lock:
+        if _exporter is None:
+            _exporter = ThreadingHTTPServer(("", port), _ExporterHandler)
+            threading.Thread(target=_exporter.serve_forever, name="metrics-exporter", daemon=True).start()
@@ -0,0 +1,381 @@
+import hashlib
+import os
+import random
+import smtplib
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email import message_from_string
+
+from dotenv import load_dotenv
+
+# Load credentials
+load_dotenv()
+
+# Email configuration
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SENDER_EMAIL = os.getenv("SENDER_EMAIL")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+
+# Dry runs deliver to a local stand-in, e.g. `python -m aiosmtpd -n -l localhost:1025`
+DRY_RUN_SMTP_SERVER = os.getenv("DRY_RUN_SMTP_SERVER", "localhost")
+DRY_RUN_SMTP_PORT = int(os.getenv("DRY_RUN_SMTP_PORT", "1025"))
+
+# Outbox configuration
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join("data", "outbox.sqlite3"))
+OUTBOX_POLL_SECONDS = int(os.getenv("OUTBOX_POLL", "5"))
+SMTP_WORKERS = int(os.getenv("SMTP_WORKERS", "4"))
+MESSAGES_PER_CONNECTION = 50
+MAX_ATTEMPTS = 6
+BASE_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 60 * 60
+# A message left 'sending' this long was orphaned by a crash and is retried
+SENDING_TIMEOUT_SECONDS = 10 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    recipient TEXT NOT NULL,
+    message TEXT NOT NULL,
+    dry_run INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+CREATE TABLE IF NOT EXISTS reminded_tickets (
+    ticket_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    PRIMARY KEY (ticket_key, day)
+);
+CREATE TABLE IF NOT EXISTS reminder_intents (
+    ticket_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    dry_run INTEGER NOT NULL,
+    ticket TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    PRIMARY KEY (ticket_key, day, dry_run)
+);
+CREATE INDEX IF NOT EXISTS reminder_intents_pending ON reminder_intents (status);
+"""
+
+_start_lock = threading.Lock()
+_thread = None
+
+
+def connect(path=OUTBOX_PATH):
+    """Open the outbox, creating the file and schema on first use."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def email_configured():
+    return None not in (SMTP_USERNAME, SMTP_PASSWORD, SENDER_EMAIL)
+
+
+def _found(conn, table, ticket_keys, day, condition=""):
+    # The keys among `ticket_keys` with a row in `table` for `day`
+    keys = list(ticket_keys)
+    found = set()
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        found.update(row[0] for row in conn.execute(
+            f"SELECT ticket_key FROM {table} WHERE day = ?{condition} "
+            f"AND ticket_key IN ({', '.join('?' * len(chunk))})",
+            [day] + chunk
+        ))
+    return found
+
+
+def queued_reminders(ticket_keys, day=None, path=OUTBOX_PATH):
+    """Return the subset of `ticket_keys` whose reminder message for `day` is in the outbox."""
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    conn = connect(path)
+    try:
+        return _found(conn, "reminded_tickets", ticket_keys, day)
+    finally:
+        conn.close()
+
+
+def already_reminded(ticket_keys, day=None, path=OUTBOX_PATH):
+    """Return the subset of `ticket_keys` already queued for a reminder on `day`."""
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    conn = connect(path)
+    try:
+        return (_found(conn, "reminded_tickets", ticket_keys, day)
+                | _found(conn, "reminder_intents", ticket_keys, day, " AND dry_run = 0"))
+    finally:
+        conn.close()
+
+
+def add_intents(tickets, dry_run=False, day=None, path=OUTBOX_PATH):
+    """Record tickets to be reminded about; returns how many were new.
+
+    `tickets` maps each ticket key to its details as a JSON string. The
+    background sender's `prepare` hook turns pending intents into messages,
+    so recording them is quick whatever the lookups behind a message cost.
+    """
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    conn = connect(path)
+    try:
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO reminder_intents (ticket_key, day, dry_run, ticket) VALUES (?, ?, ?, ?)",
+                [(key, day, int(dry_run), ticket) for key, ticket in tickets.items()]
+            )
+            return conn.total_changes - before
+    finally:
+        conn.close()
+
+
+def pending_intents(path=OUTBOX_PATH):
+    """Intents not yet turned into messages, as (ticket_key, day, dry_run, ticket) rows."""
+    conn = connect(path)
+    try:
+        return [
+            (key, day, bool(dry_run), ticket) for key, day, dry_run, ticket in conn.execute(
+                "SELECT ticket_key, day, dry_run, ticket FROM reminder_intents WHERE status = 'pending'"
+            )
+        ]
+    finally:
+        conn.close()
+
+
+def resolve_intents(ticket_keys, day, dry_run, status, path=OUTBOX_PATH):
+    """Mark intents 'queued' once their message is in the outbox, or 'unresolved'."""
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                "UPDATE reminder_intents SET status = ? WHERE ticket_key = ? AND day = ? AND dry_run = ?",
+                [(status, key, day, int(dry_run)) for key in ticket_keys]
+            )
+    finally:
+        conn.close()
+
+
+def unresolved_tickets(day=None, path=OUTBOX_PATH):
+    """Keys of the tickets reminded about on `day` whose message couldn't be addressed."""
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    conn = connect(path)
+    try:
+        return sorted({row[0] for row in conn.execute(
+            "SELECT ticket_key FROM reminder_intents WHERE day = ? AND status = 'unresolved'", (day,)
+        )})
+    finally:
+        conn.close()
+
+
+def enqueue(recipient, message, ticket_keys, dry_run=False, day=None, path=OUTBOX_PATH):
+    """Record a message for delivery; returns False if any of its tickets already has one.
+
+    Each ticket is recorded once per day, and a message is only queued
+    while none of its tickets is, so a rerun (or a retry after a crash,
+    however the tickets are grouped) never reminds anyone twice. The
+    idempotency key is the day, the recipient and how many messages they
+    already have that day. Dry runs are keyed apart and never recorded as
+    reminders, so they don't use up the day's real ones.
+    """
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    ticket_keys = sorted(ticket_keys)
+    prefix = f"{'dry-run:' if dry_run else ''}{day}:{recipient}:"
+
+    conn = connect(path)
+    try:
+        with conn:
+            # Locked before reading, so two senders can't both find the tickets unreminded
+            conn.execute("BEGIN IMMEDIATE")
+            if not dry_run and _found(conn, "reminded_tickets", ticket_keys, day):
+                return False
+            # Sequence numbers are digits, which sort before "~"
+            sequence = conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE idempotency_key > ? AND idempotency_key < ?",
+                (prefix, prefix + "~")
+            ).fetchone()[0]
+            idempotency_key = f"{prefix}{sequence}"
+            # Lets receiving servers drop a duplicate if a crash forces a resend
+            del message['Message-ID']
+            message['Message-ID'] = f"<{hashlib.sha1(idempotency_key.encode()).hexdigest()}@pm-assist>"
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, recipient, message, dry_run, "
+                "next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (idempotency_key, recipient, message.as_string(), int(dry_run), time.time(), time.time())
+            )
+            if not cursor.rowcount:
+                return False
+            if dry_run:
+                return True
+            conn.executemany(
+                "INSERT OR IGNORE INTO reminded_tickets (ticket_key, day, message_id) VALUES (?, ?, ?)",
+                [(key, day, cursor.lastrowid) for key in ticket_keys]
+            )
+        return True
+    finally:
+        conn.close()
+
+
+def counts(path=OUTBOX_PATH):
+    """Return the number of messages per status (queued, sending, sent, failed).
+
+    `pending` is the number of tickets whose message hasn't been prepared yet.
+    """
+    conn = connect(path)
+    try:
+        totals = {"queued": 0, "sending": 0, "sent": 0, "failed": 0}
+        totals.update(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        totals["pending"] = conn.execute(
+            "SELECT COUNT(*) FROM reminder_intents WHERE status = 'pending'"
+        ).fetchone()[0]
+        return totals
+    finally:
+        conn.close()
+
+
+def _claim_due(conn, limit):
+    """Atomically mark up to `limit` due messages as sending and return them."""
+    now = time.time()
+    with conn:
+        conn.execute(
+            "UPDATE outbox SET status = 'queued' WHERE status = 'sending' AND claimed_at < ?",
+            (now - SENDING_TIMEOUT_SECONDS,)
+        )
+        rows = conn.execute(
+            "SELECT id, recipient, message, dry_run, attempts FROM outbox "
+            "WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+            (now, limit)
+        ).fetchall()
+        claimed = []
+        for row in rows:
+            cursor = conn.execute(
+                "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ? AND status = 'queued'",
+                (now, row[0])
+            )
+            if cursor.rowcount:
+                claimed.append(row)
+    return claimed
+
+
+def _open_smtp(dry_run):
+    if dry_run:
+        return smtplib.SMTP(DRY_RUN_SMTP_SERVER, DRY_RUN_SMTP_PORT, timeout=30)
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=30)
+    if SMTP_STARTTLS:
+        server.starttls()
+    server.login(SMTP_USERNAME, SMTP_PASSWORD)
+    return server
+
+
+def _backoff(attempts):
+    delay = min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return delay + random.uniform(0, delay / 2)
+
+
+def _deliver_batch(batch, dry_run, path):
+    """Send a batch over one SMTP connection and record each outcome."""
+    results = []
+    server = None
+    try:
+        server = _open_smtp(dry_run)
+        for message_id, recipient, message, _, attempts in batch:
+            try:
+                server.send_message(message_from_string(message), to_addrs=[recipient])
+                results.append((message_id, attempts, None))
+            except smtplib.SMTPException as e:
+                results.append((message_id, attempts, str(e)))
+    except (OSError, smtplib.SMTPException) as e:
+        # Couldn't connect or log in; everything not yet sent is retried later
+        done = {result[0] for result in results}
+        results.extend((row[0], row[4], str(e)) for row in batch if row[0] not in done)
+    finally:
+        if server is not None:
+            try:
+                server.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+
+    conn = connect(path)
+    try:
+        with conn:
+            for message_id, attempts, error in results:
+                if error is None:
+                    conn.execute(
+                        "UPDATE outbox SET status = 'sent', sent_at = ?, attempts = ?, last_error = NULL "
+                        "WHERE id = ?",
+                        (time.time(), attempts + 1, message_id)
+                    )
+                else:
+                    attempts += 1
+                    conn.execute(
+                        "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                        "WHERE id = ?",
+                        ("failed" if attempts >= MAX_ATTEMPTS else "queued", attempts,
+                         time.time() + _backoff(attempts), error, message_id)
+                    )
+    finally:
+        conn.close()
+
+
+def drain(path=OUTBOX_PATH):
+    """Deliver every message that is due; returns the number attempted."""
+    conn = connect(path)
+    try:
+        claimed = _claim_due(conn, MESSAGES_PER_CONNECTION * SMTP_WORKERS)
+    finally:
+        conn.close()
+    if not claimed:
+        return 0
+
+    batches = []
+    for dry_run in (0, 1):
+        rows = [row for row in claimed if row[3] == dry_run]
+        batches.extend(
+            (rows[start:start + MESSAGES_PER_CONNECTION], bool(dry_run))
+            for start in range(0, len(rows), MESSAGES_PER_CONNECTION)
+        )
+    with ThreadPoolExecutor(max_workers=min(SMTP_WORKERS, len(batches))) as pool:
+        list(pool.map(lambda batch: _deliver_batch(batch[0], batch[1], path), batches))
+    return len(claimed)
+
+
+def _run(path, prepare):
+    while True:
+        for step in ([prepare] if prepare is not None else []) + [drain]:
+            try:
+                while step(path):
+                    pass
+            except Exception as e:
+                print(f"[outbox] {datetime.now():%Y-%m-%d %H:%M:%S}: {e}", file=sys.stderr)
+        time.sleep(OUTBOX_POLL_SECONDS)
+
+
+def start(path=OUTBOX_PATH, prepare=None):
+    """Start the background sender once per process; later calls do nothing.
+
+    `prepare(path)` runs before each delivery run to turn pending intents
+    into messages (see reminders.prepare_reminders); like `drain`, it is
+    called again while it returns a true value.
+    """
+    global _thread
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(path, prepare), name="outbox-sender", daemon=True)
+            _thread.start()
@@ -0,0 +1,120 @@
+import os
+import threading
+from collections import namedtuple
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import flow_metrics
+import metrics
+import report
+
+# Statuses that count as QA work; tickets in them belong to their assignee's QA queue
+QA_STATUSES = [s.strip() for s in os.getenv(
+    "QA_STATUSES", "QA,In QA,Ready for QA,In Testing,Testing"
+).split(",")]
+
+# `tickets` are the issues currently in QA with Days in QA (current stay);
+# `testers` and `components` summarise them, and `components` also has the
+# average total QA time of every ticket that has been through QA
+QAWorkload = namedtuple("QAWorkload", ["tickets", "testers", "components"])
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def qa_workload(frame, timeline, now=None):
+    """Compute QA workload from an issue frame and its status timeline."""
+    in_qa = frame[frame['Status'].isin(QA_STATUSES)]
+    stay = flow_metrics.current_stay(timeline, now)
+    tickets = in_qa.assign(**{'Days in QA': stay.reindex(in_qa['Key']).round(1).to_numpy()})
+    tickets = tickets.sort_values('Days in QA', ascending=False, kind='stable')
+
+    testers = tickets.groupby('Assignee', observed=True).agg(**{
+        'In QA': ('Key', 'size'),
+        'Avg Days in QA': ('Days in QA', 'mean'),
+        'Oldest (Days)': ('Days in QA', 'max'),
+    })
+    by_status = tickets.groupby(['Assignee', 'Status'], observed=True).size().unstack(fill_value=0)
+    by_status.columns = by_status.columns.astype(str)
+    testers = testers.join(by_status).round(1).sort_values('In QA', ascending=False)
+
+    components = tickets.groupby('Component', observed=True).agg(**{
+        'Queue Depth': ('Key', 'size'),
+        'Avg Wait (Days)': ('Days in QA', 'mean'),
+        'Oldest (Days)': ('Days in QA', 'max'),
+    })
+    # Total time every ticket (finished or not) has spent in QA
+    qa_days = flow_metrics.days_in(timeline, QA_STATUSES, now)
+    through_qa = frame[frame['Key'].isin(qa_days.index)]
+    components['Avg QA Days per Ticket'] = pd.Series(
+        qa_days.reindex(through_qa['Key']).to_numpy(), index=through_qa.index
+    ).groupby(through_qa['Component'], observed=True).mean()
+    components = components.round(1).sort_values('Queue Depth', ascending=False)
+
+    return QAWorkload(tickets, testers.reset_index(), components.reset_index())
+
+
+def workload_for(snapshot):
+    """QA workload for a snapshot, computed once per data version."""
+    with _cache_lock:
+        cached = _cache.get(snapshot.version)
+    if cached is None:
+        cached = qa_workload(snapshot.frame, snapshot.timeline)
+        with _cache_lock:
+            _cache.clear()
+            _cache[snapshot.version] = cached
+    return cached
+
+
+def render(snapshot, jira_url=report.JIRA_URL):
+    """Draw the QA Utilisation page from the published snapshot."""
+    with metrics.timed("rerun.qa"):
+        workload = workload_for(snapshot)
+
+    if workload.tickets.empty:
+        st.info(f"No tickets are in a QA status ({', '.join(QA_STATUSES)}).")
+        return
+
+    st.markdown("### Key Metrics")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Tickets in QA", len(workload.tickets))
+    with col2:
+        st.metric("Testers", len(workload.testers))
+    with col3:
+        st.metric("Avg Days in QA", f"{workload.tickets['Days in QA'].mean():.1f}")
+    with col4:
+        st.metric("Oldest (Days)", f"{workload.tickets['Days in QA'].max():.1f}")
+
+    st.markdown("### Workload per Tester")
+    st.dataframe(workload.testers, hide_index=True, use_container_width=True)
+    # Plain labels keep unobserved categories out of the chart
+    per_tester = workload.tickets.groupby(['Assignee', 'Status'], observed=True).size().reset_index(name='Tickets')
+    fig = px.bar(
+        per_tester.astype({'Assignee': str, 'Status': str}),
+        x='Assignee',
+        y='Tickets',
+        color='Status',
+        title='Tickets in QA per Tester',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### QA Queue by Component")
+    st.dataframe(workload.components, hide_index=True, use_container_width=True)
+
+    st.markdown("### Tickets in QA")
+    st.markdown("Longest waiting first")
+    tickets = workload.tickets.assign(**{'JIRA Link': f"{jira_url}/browse/" + workload.tickets['Key']})
+    st.dataframe(
+        tickets[['JIRA Link', 'Assignee', 'Status', 'Component', 'Days in QA', 'Priority', 'Summary']],
+        column_config={
+            "JIRA Link": st.column_config.LinkColumn("JIRA ID", width="small", display_text=r"/browse/(.*)$"),
+            "Days in QA": st.column_config.NumberColumn("Days in QA", format="%.1f"),
+            "Summary": st.column_config.TextColumn("Summary", width="large", max_chars=100)
+        },
+        hide_index=True,
+        use_container_width=True
+    )
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+import component_index
+import metrics
+
+# Result cache configuration
+CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_ENTRIES", "32"))
+CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL", "600"))
+
+# A home-page filter; None means "not restricted" for every field
+Query = namedtuple("Query", ["project", "component", "created_from", "created_to"])
+
+
+def make_query(project=None, component=None, created_from=None, created_to=None):
+    """Build a normalised Query; dates may be date objects or 'YYYY-MM-DD' strings."""
+    return Query(
+        None if project in (None, "All") else project,
+        None if component in (None, "All") else component,
+        str(created_from)[:10] if created_from is not None else None,
+        str(created_to)[:10] if created_to is not None else None,
+    )
+
+
+def to_jql(query, base_jql):
+    """Render a Query as the JQL it stands for, in one canonical form."""
+    parts = [f"({base_jql})"]
+    if query.component is not None:
+        parts.append(f'component = "{query.component}"')
+    if query.created_from is not None:
+        parts.append(f'created >= "{query.created_from}"')
+    if query.created_to is not None:
+        parts.append(f'created <= "{query.created_to}"')
+    return ' AND '.join(parts)
+
+
+def covers(wider, narrower):
+    """True if every issue matching `narrower` also matches `wider`."""
+    if wider.project is not None and wider.project != narrower.project:
+        return False
+    if wider.component is not None and wider.component != narrower.component:
+        return False
+    if wider.created_from is not None and (
+            narrower.created_from is None or narrower.created_from < wider.created_from):
+        return False
+    if wider.created_to is not None and (
+            narrower.created_to is None or narrower.created_to > wider.created_to):
+        return False
+    return True
+
+
+def narrow(frame, query, components=None, rows=None):
+    """Filter an issue frame (Created as datetime64) down to `query`.
+
+    Issues match a component they are tagged with, not only their first
+    one. `components` is the frame's component_index.ComponentIndex, if
+    it has one; the component's rows are then looked up instead of scanned.
+    `rows` limits the result to those positions, kept in their order (e.g.
+    search results, best first).
+    """
+    if rows is not None:
+        if query.component is not None and components is not None:
+            rows = rows[np.isin(rows, component_index.rows(components, query.component))]
+            query = query._replace(component=None)
+        frame = frame.iloc[rows]
+    elif query.component is not None and components is not None:
+        frame = frame.iloc[component_index.rows(components, query.component)]
+    mask = pd.Series(True, index=frame.index)
+    if query.project is not None:
+        mask &= frame["Project"] == query.project
+    if query.component is not None and components is None:
+        mask &= component_index.contains(frame["Components"], query.component)
+    if query.created_from is not None:
+        mask &= frame["Created"] >= pd.Timestamp(query.created_from)
+    if query.created_to is not None:
+        mask &= frame["Created"] <= pd.Timestamp(query.created_to)
+    return frame[mask].reset_index(drop=True)
+
+
+class QueryCache:
+    """Process-wide TTL + LRU cache of issue frames keyed by data version and Query.
+
+    A miss is answered by narrowing any cached frame for a wider query on the
+    same data version before falling back to `loader`.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.subsumed = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, version, query):
+        now = time.monotonic()
+        for key in [key for key, (stored_at, _) in self._entries.items()
+                    if now - stored_at > self.ttl_seconds]:
+            del self._entries[key]
+
+        entry = self._entries.get((version, query))
+        if entry is not None:
+            self._entries.move_to_end((version, query))
+            self.hits += 1
+            metrics.inc("query_cache_hits")
+            return entry[1]
+
+        for (cached_version, cached_query), (_, frame) in reversed(self._entries.items()):
+            if cached_version == version and covers(cached_query, query):
+                self._entries.move_to_end((cached_version, cached_query))
+                self.subsumed += 1
+                metrics.inc("query_cache_subsumed")
+                return narrow(frame, query)
+        return None
+
+    def _insert(self, version, query, frame):
+        self._entries[(version, query)] = (time.monotonic(), frame)
+        self._entries.move_to_end((version, query))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, version, query, loader):
+        """Return a private copy of the frame for `query`, loading it on a miss."""
+        with self._lock:
+            frame = self._lookup(version, query)
+        if frame is None:
+            metrics.inc("query_cache_misses")
+            frame = loader(query)
+            with self._lock:
+                self.misses += 1
+                self._insert(version, query, frame)
+        return frame.copy()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by every Streamlit session in the process
+results = QueryCache()
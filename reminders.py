@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pandas as pd
+from dotenv import load_dotenv
+from jira import JIRAError
+
+import issue_store
+import jira_gateway
+import outbox
+
+# Load credentials
+load_dotenv()
+
+USER_CACHE_TTL_SECONDS = 24 * 60 * 60
+USER_LOOKUP_WORKERS = 4
+
+JIRA_URL = os.getenv("JIRA_URL")
+
+# The ticket details a reminder is written from
+TICKET_FIELDS = ["Key", "Summary", "Status", "Created", "Assignee", "Suggested Component", "Confidence"]
+
+# One email per recipient; `tickets` is a list of issue-frame rows as dicts,
+# optionally with a Suggested Component and its Confidence
+Digest = namedtuple("Digest", ["recipient", "name", "tickets"])
+# `queued` tickets were recorded for a reminder; `already_reminded` were skipped
+ReminderResult = namedtuple("ReminderResult", ["queued", "already_reminded"])
+
+_user_emails = {}
+_user_emails_lock = threading.Lock()
+
+
+def lookup_email(jira, user_id):
+    """Return a Jira user's emailAddress, cached for a day (None if they have none).
+
+    Failed lookups are raised rather than cached, so the next one tries
+    again; only a user Jira doesn't know is cached as having no address.
+    """
+    if not user_id:
+        return None
+    with _user_emails_lock:
+        cached = _user_emails.get(user_id)
+    if cached is not None and time.time() - cached[1] < USER_CACHE_TTL_SECONDS:
+        return cached[0]
+    try:
+        email = getattr(jira.user(user_id), "emailAddress", None) or None
+    except JIRAError as e:
+        if e.status_code != 404:
+            raise
+        email = None
+    with _user_emails_lock:
+        _user_emails[user_id] = (email, time.time())
+    return email
+
+
+def build_digests(jira, tickets):
+    """Group tickets into one digest per assignee email.
+
+    `tickets` is a list of issue-frame rows as dicts. Returns the digests
+    and the keys of tickets whose assignee has no email address; tickets
+    whose assignee couldn't be looked up are in neither, to be tried again.
+    """
+    ids = issue_store.assignee_ids(ticket['Key'] for ticket in tickets)
+    user_ids = sorted({user_id for user_id in ids.values() if user_id})
+    with ThreadPoolExecutor(max_workers=USER_LOOKUP_WORKERS) as pool:
+        lookups = {user_id: pool.submit(lookup_email, jira, user_id) for user_id in user_ids}
+    emails, failed = {}, set()
+    for user_id, lookup in lookups.items():
+        try:
+            emails[user_id] = lookup.result()
+        except Exception:
+            failed.add(user_id)
+
+    digests = {}
+    unresolved = []
+    for ticket in tickets:
+        if ids.get(ticket['Key']) in failed:
+            continue
+        email = emails.get(ids.get(ticket['Key']))
+        if not email:
+            unresolved.append(ticket['Key'])
+            continue
+        if email not in digests:
+            digests[email] = Digest(email, ticket['Assignee'], [])
+        digests[email].tickets.append(ticket)
+    return list(digests.values()), unresolved
+
+
+def digest_message(digest):
+    """Render a digest as a MIME message."""
+    msg = MIMEMultipart()
+    msg['From'] = outbox.SENDER_EMAIL or "pm-assist@localhost"
+    msg['To'] = digest.recipient
+    count = len(digest.tickets)
+    msg['Subject'] = (
+        f"Action Required: Add Component to JIRA Ticket {digest.tickets[0]['Key']}"
+        if count == 1 else
+        f"Action Required: Add Components to {count} JIRA Tickets"
+    )
+
+    ticket_lines = '\n'.join(
+        f"- {ticket['Key']}: {ticket['Summary']}\n"
+        f"  Status: {ticket['Status']} | Created: {ticket['Created']:%Y-%m-%d}\n"
+        + (f"  Suggested component: {ticket['Suggested Component']} ({ticket['Confidence']:.0%} confidence)\n"
+           if isinstance(ticket.get('Suggested Component'), str) else "")
+        + f"  {JIRA_URL}/browse/{ticket['Key']}"
+        for ticket in digest.tickets
+    )
+    body = f"""Hello {digest.name},
+
+The following JIRA ticket(s) assigned to you need a component:
+
+{ticket_lines}
+
+Please add an appropriate component at your earliest convenience.
+
+Best regards,
+PM Assist Bot
+"""
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+def queue_component_reminders(tickets, dry_run=False):
+    """Record reminders for tickets that have no component.
+
+    `tickets` is an issue frame. Tickets already reminded today are
+    skipped. Nothing is looked up here: the outbox's background sender
+    resolves assignee emails and builds the digests (see
+    `prepare_reminders`), so this returns at once. With `dry_run` the
+    digests go to the local DRY_RUN_SMTP_SERVER stand-in instead of the
+    real relay.
+    """
+    reminded = outbox.already_reminded(tickets['Key'])
+    pending = tickets[~tickets['Key'].isin(reminded)]
+    details = pending[[field for field in TICKET_FIELDS if field in pending]]
+    records = json.loads(details.to_json(orient='records', date_format='iso'))
+    queued = outbox.add_intents({ticket['Key']: json.dumps(ticket) for ticket in records}, dry_run=dry_run)
+    return ReminderResult(queued, len(reminded))
+
+
+def prepare_reminders(path=outbox.OUTBOX_PATH):
+    """Turn pending reminder intents into one queued digest per assignee.
+
+    The outbox's `prepare` hook, run in its background sender. Returns
+    how many intents were handled; tickets whose assignee has no email
+    address are marked unresolved, and those whose lookup failed stay
+    pending for the next run. Tickets whose reminder is already in the
+    outbox (e.g. queued just before a crash) are only marked queued.
+    """
+    groups = defaultdict(list)
+    for key, day, dry_run, ticket in outbox.pending_intents(path):
+        ticket = json.loads(ticket)
+        ticket['Created'] = pd.Timestamp(ticket['Created'])
+        groups[day, dry_run].append(ticket)
+    if not groups:
+        return 0
+    jira = jira_gateway.get_jira()
+    handled = 0
+    for (day, dry_run), tickets in groups.items():
+        if not dry_run:
+            queued = outbox.queued_reminders([ticket['Key'] for ticket in tickets], day, path)
+            outbox.resolve_intents(queued, day, dry_run, 'queued', path)
+            handled += len(queued)
+            tickets = [ticket for ticket in tickets if ticket['Key'] not in queued]
+        digests, unresolved = build_digests(jira, tickets)
+        for digest in digests:
+            keys = [ticket['Key'] for ticket in digest.tickets]
+            # Left pending if another sender got some of the tickets first
+            if outbox.enqueue(digest.recipient, digest_message(digest), keys, dry_run=dry_run, day=day, path=path):
+                outbox.resolve_intents(keys, day, dry_run, 'queued', path)
+                handled += len(keys)
+        outbox.resolve_intents(unresolved, day, dry_run, 'unresolved', path)
+        handled += len(unresolved)
+    return handled
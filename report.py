@@ -0,0 +1,195 @@
+import argparse
+import html
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+import aggregations
+import component_index
+import issue_store
+import query_cache
+
+# Load credentials
+load_dotenv()
+
+JIRA_URL = os.getenv("JIRA_URL", "")
+
+FORMATS = ["parquet", "csv", "html"]
+# Columns of the detailed issue list, in display order
+DETAIL_COLUMNS = ['JIRA Link', 'Issue Type', 'Assignee', 'Status', 'Components',
+                  'Created', 'Aging (Days)', 'Summary']
+# Rows per page of the dashboard's issue list, and summary length shown there
+PAGE_SIZE = int(os.getenv("ISSUE_PAGE_SIZE", "50"))
+SUMMARY_CHARS = 100
+
+# The aggregates behind one dashboard view: `issues` is the narrowed issue
+# frame and `summary` the output of aggregations.summarise_components
+Report = namedtuple("Report", ["query", "issues", "summary"])
+
+
+def detailed_issues(issues, jira_url=JIRA_URL):
+    """The detailed issue list: newest first, with a browse URL per issue."""
+    detail = component_index.display(issues.sort_values('Created', ascending=False, kind='stable'))
+    return detail.assign(**{'JIRA Link': f"{jira_url}/browse/" + detail['Key']})[DETAIL_COLUMNS]
+
+
+def issue_page(issues, page=0, sort_by='Created', ascending=False,
+               page_size=PAGE_SIZE, jira_url=JIRA_URL):
+    """One page of the detailed issue list, sorted across all of `issues`.
+
+    Only the sort column is ordered over the whole frame; links and
+    truncated summaries are built for the page's rows alone, so the table
+    sent to the browser has the same size however many issues match.
+    `sort_by=None` keeps the order of `issues` (e.g. search relevance).
+    """
+    if sort_by is None:
+        order = range(len(issues))
+    else:
+        order = issues[sort_by].reset_index(drop=True).sort_values(ascending=ascending, kind='stable').index
+    rows = component_index.display(issues.iloc[order[page * page_size:(page + 1) * page_size]])
+    summary = rows['Summary']
+    long_summary = summary.str.len() > SUMMARY_CHARS
+    return rows.assign(**{
+        'JIRA Link': f"{jira_url}/browse/" + rows['Key'],
+        'Summary': summary.where(~long_summary, summary.str.slice(0, SUMMARY_CHARS - 1) + '…'),
+    })[DETAIL_COLUMNS]
+
+
+def build_report(frame, query):
+    """Narrow an issue frame to `query` and aggregate it the way the dashboard does."""
+    issues = query_cache.narrow(frame, query)
+    return Report(query, issues, aggregations.summarise_components(issues))
+
+
+def _tables(report, jira_url):
+    return {
+        "work_volume_matrix": report.summary['matrix'].reset_index(),
+        "component_distribution": report.summary['components'],
+        "issues": detailed_issues(report.issues, jira_url),
+    }
+
+
+def render_html(report, title, jira_url=JIRA_URL, data_as_of=None):
+    """A self-contained HTML page with the dashboard's charts and tables."""
+    # Plotly is only needed for HTML output, so it isn't loaded for Parquet/CSV runs
+    import charts
+
+    components = report.summary['components']
+    assigned = components[components['Component'] != aggregations.NO_COMPONENT]
+    pie_slices = aggregations.top_components(assigned, report.summary['counts'])[0]
+    bar_counts = aggregations.top_components(components, report.summary['counts'])[1]
+    pie = charts.component_pie(pie_slices).to_html(full_html=False, include_plotlyjs='cdn')
+    bar = charts.status_bar(bar_counts).to_html(full_html=False, include_plotlyjs=False)
+    # Plain text breakdowns, so every cell can be escaped
+    component_rows = assigned.assign(**{
+        'Status Breakdown': assigned['Status Breakdown'].str.replace('<br>', ', ', regex=False)
+    })
+    tables = _tables(report, jira_url)
+    as_of = f" &middot; data as of {data_as_of:%Y-%m-%d %H:%M}" if data_as_of else ""
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+  body {{ font-family: sans-serif; margin: 2rem; color: #002e6e; }}
+  table {{ border-collapse: collapse; font-size: 0.85rem; }}
+  th, td {{ border: 1px solid #e5e7eb; padding: 0.25rem 0.5rem; text-align: left; }}
+  th {{ background: #f8f9fa; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p><code>{html.escape(query_cache.to_jql(report.query, issue_store.base_jql(report.query.project)))}</code><br>
+{len(report.issues)} issues &middot; generated {datetime.now():%Y-%m-%d %H:%M}{as_of}</p>
+<h2>Component Distribution</h2>
+{pie}
+{component_rows.to_html(index=False)}
+<h2>Work Volume Matrix</h2>
+{tables['work_volume_matrix'].to_html(index=False)}
+<h2>Status Distribution by Component</h2>
+{bar}
+<h2>Detailed Issue List</h2>
+{tables['issues'].to_html(index=False, render_links=True)}
+</body>
+</html>
+"""
+
+
+def write_report(report, directory, formats=FORMATS, title="PG Board Dashboard",
+                 jira_url=JIRA_URL, data_as_of=None):
+    """Write a report's tables (and optionally an HTML page) into `directory`.
+
+    Returns the paths written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = []
+    for name, table in _tables(report, jira_url).items():
+        if "parquet" in formats:
+            written.append(os.path.join(directory, f"{name}.parquet"))
+            table.to_parquet(written[-1], index=False)
+        if "csv" in formats:
+            written.append(os.path.join(directory, f"{name}.csv"))
+            table.to_csv(written[-1], index=False)
+    if "html" in formats:
+        written.append(os.path.join(directory, "report.html"))
+        with open(written[-1], "w", encoding="utf-8") as f:
+            f.write(render_html(report, title, jira_url, data_as_of))
+    return written
+
+
+def slug(query):
+    name = query.component or "board"
+    if query.project:
+        name = f"{query.project}_{name}"
+    if query.created_from or query.created_to:
+        name += f"_{query.created_from or 'start'}_{query.created_to or 'today'}"
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-").lower()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write the dashboard's aggregates to Parquet, CSV and HTML without Streamlit."
+    )
+    parser.add_argument("--out", default="reports", help="directory for the reports (default: reports)")
+    parser.add_argument("--project", choices=list(issue_store.PROJECTS),
+                        help="report on one project (default: every configured project)")
+    parser.add_argument("--component", action="append",
+                        help="report on one component; repeat for several (default: the whole board)")
+    parser.add_argument("--from", dest="created_from", help="created on or after YYYY-MM-DD")
+    parser.add_argument("--to", dest="created_to", help="created on or before YYYY-MM-DD")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=FORMATS, dest="formats")
+    parser.add_argument("--store", default=issue_store.STORE_PATH, help="issue store to read")
+    parser.add_argument("--sync", action="store_true", help="sync the issue store from Jira first")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.sync:
+        # The Jira client is only loaded when asked to sync
+        import jira_gateway
+        issue_store.sync_if_due(jira_gateway.get_jira(), args.store)
+    if issue_store.last_synced_at(args.store, args.project) is None:
+        print(f"No issues in {args.store}; run with --sync or start the dashboard first.", file=sys.stderr)
+        return 1
+
+    # Load the board once; every report below is narrowed from it in memory
+    frame = issue_store.load_frame(path=args.store, project=args.project)
+    data_as_of = issue_store.last_synced_at(args.store, args.project)
+    for component in args.component or [None]:
+        query = query_cache.make_query(args.project, component, args.created_from, args.created_to)
+        report = build_report(frame, query)
+        title = ": ".join(["PG Board Dashboard"] + [name for name in (args.project, component) if name])
+        for path in write_report(report, os.path.join(args.out, slug(query)), args.formats,
+                                 title=title, data_as_of=data_as_of):
+            print(path)
+    print(f"Done in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
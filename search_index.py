@@ -0,0 +1,120 @@
+import re
+from bisect import bisect_left
+from collections import namedtuple
+
+import numpy as np
+
+# A word in a summary or key; "PGP-123" is the words "pgp" and "123"
+WORD = re.compile(r"\w+")
+
+# Inverted index over each row's key and summary. `terms` is sorted, so the
+# terms sharing a prefix are one run terms[i:j], whose postings are
+# rows[offsets[i]:offsets[j]] with each term's idf alongside in `weights`.
+# `size` is the number of rows; `vocabulary` carries tokenised texts to the
+# next build.
+SearchIndex = namedtuple("SearchIndex", ["terms", "offsets", "rows", "weights", "size", "vocabulary"])
+
+
+def words(text):
+    """The lower-cased words of `text`, in order."""
+    return WORD.findall(text.lower())
+
+
+class Vocabulary:
+    """Term ids of every text indexed so far.
+
+    Rebuilding the index for a new snapshot only tokenises the texts that
+    are new or edited; the rest are looked up here.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.terms = []
+        self.texts = {}
+
+    def _id(self, term):
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def term_ids(self, text):
+        """Distinct term ids of `text`."""
+        ids = self.texts.get(text)
+        if ids is None:
+            ids = self.texts[text] = np.array(sorted({self._id(term) for term in words(text)}), dtype=np.int32)
+        return ids
+
+    def keep(self, texts):
+        """Forget the texts no longer indexed."""
+        self.texts = {text: self.texts[text] for text in texts}
+
+
+def build(frame, previous=None):
+    """Index the frame's Key and Summary columns.
+
+    Pass the previous snapshot's index as `previous` to reuse its
+    tokenised texts, so only changed issues are tokenised again.
+    """
+    vocabulary = previous.vocabulary if previous is not None else Vocabulary()
+    texts = (frame['Key'] + " " + frame['Summary'].fillna("")).tolist()
+    per_row = [vocabulary.term_ids(text) for text in texts]
+    vocabulary.keep(texts)
+
+    lengths = np.fromiter(map(len, per_row), dtype=np.int64, count=len(per_row))
+    term_ids = np.concatenate(per_row) if per_row else np.empty(0, dtype=np.int32)
+    row_ids = np.repeat(np.arange(len(frame), dtype=np.int64), lengths)
+
+    # Number the terms in use alphabetically, so prefixes become runs
+    used = np.unique(term_ids)
+    names = np.array(vocabulary.terms, dtype=object)[used]
+    alphabetical = np.argsort(names, kind='stable')
+    rank = np.zeros(len(vocabulary.terms), dtype=np.int64)
+    rank[used[alphabetical]] = np.arange(len(used))
+    postings = np.sort(rank[term_ids] * max(len(frame), 1) + row_ids)
+    posting_terms = postings // max(len(frame), 1)
+
+    counts = np.bincount(posting_terms, minlength=len(used))
+    # Rare words say more about a ticket than common ones
+    idf = np.log1p(len(frame) / np.maximum(counts, 1)).astype(np.float32)
+    return SearchIndex(
+        names[alphabetical].tolist(),
+        np.concatenate([[0], np.cumsum(counts)]),
+        (postings % max(len(frame), 1)).astype(np.int32),
+        idf[posting_terms],
+        len(frame),
+        vocabulary,
+    )
+
+
+def _scores(index, word):
+    # Rows containing a term starting with `word`, scored by those terms' idf
+    first = bisect_left(index.terms, word)
+    last = bisect_left(index.terms, word[:-1] + chr(ord(word[-1]) + 1), first)
+    start, stop = index.offsets[first], index.offsets[last]
+    scores = np.bincount(index.rows[start:stop], weights=index.weights[start:stop], minlength=index.size)
+    if first < last and index.terms[first] == word:
+        # Whole-word matches rank above matches on a longer word
+        start, stop = index.offsets[first], index.offsets[first + 1]
+        scores += np.bincount(index.rows[start:stop], weights=index.weights[start:stop], minlength=index.size)
+    return scores
+
+
+def search(index, query):
+    """Rows matching every word of `query`, best first, as (rows, scores).
+
+    A query word matches any term it is a prefix of, so results show up
+    while a word is still being typed; a query without words matches nothing.
+    """
+    total = None
+    for word in dict.fromkeys(words(query)):
+        scores = _scores(index, word)
+        total = scores if total is None else np.where((total > 0) & (scores > 0), total + scores, 0)
+    if total is None:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    matched = np.flatnonzero(total)
+    # Ties keep frame order
+    best = matched[np.argsort(-total[matched], kind='stable')]
+    return best, total[best]
+
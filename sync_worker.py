@@ -0,0 +1,117 @@
+import os
+import sys
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+import assignee_index
+import component_index
+import component_suggestions
+import history
+import issue_store
+import jira_gateway
+import metrics
+import search_index
+
+# How often the worker wakes to sync (when due) and look for new data
+WORKER_POLL_SECONDS = int(os.getenv("SYNC_WORKER_POLL", "5"))
+# Set to false when a separate `python sync_worker.py` process does the syncing
+SYNC_IN_DASHBOARD = os.getenv("SYNC_IN_DASHBOARD", "true").lower() == "true"
+
+# An immutable view of the processed issue frame, its per-assignee, component
+# and search indexes, the status timeline and component suggestions for
+# untagged issues; sessions must not modify any of them
+Snapshot = namedtuple("Snapshot", ["version", "frame", "assignees", "components", "search", "timeline",
+                                   "suggestions", "synced_at", "published_at"])
+
+_snapshot = None
+_first_snapshot = threading.Event()
+_wake = threading.Event()
+_start_lock = threading.Lock()
+_thread = None
+
+# Most recent sync failure, cleared by the next successful sync
+last_error = None
+connected_user = None
+
+
+def _publish_if_changed():
+    global _snapshot
+    version = issue_store.data_version()
+    if _snapshot is not None and _snapshot.version == version:
+        # A sync that found nothing new still moves the data's as-of time
+        synced_at = issue_store.last_synced_at()
+        if synced_at != _snapshot.synced_at:
+            _snapshot = _snapshot._replace(synced_at=synced_at)
+        return
+    with metrics.timed("sync.publish"):
+        frame = issue_store.load_frame()
+        assignees = assignee_index.build(frame)
+        components = component_index.build(frame)
+        # Only issues whose key or summary changed are tokenised again
+        search = search_index.build(frame, _snapshot.search if _snapshot is not None else None)
+        timeline = issue_store.load_timeline()
+        # The model only learns from tickets tagged or edited since the last snapshot
+        suggestions = component_suggestions.refresh(frame)
+    # Swapping the reference is atomic; readers see either the old or the new snapshot
+    _snapshot = Snapshot(version, frame, assignees, components, search, timeline, suggestions,
+                         issue_store.last_synced_at(), datetime.now())
+    _first_snapshot.set()
+
+
+def run_once(sync=True):
+    """Sync the store (when due) and publish a new snapshot if the data changed."""
+    global last_error, connected_user
+    trace = metrics.Trace("sync")
+    if sync:
+        try:
+            jira = jira_gateway.get_jira()
+            connected_user = jira_gateway.current_user()
+            issue_store.sync_if_due(jira)
+            last_error = None
+        except Exception as e:
+            # Keep serving the stored data; the sidebar reports the failure
+            last_error = f"{datetime.now():%Y-%m-%d %H:%M:%S}: {e}"
+            print(f"[sync_worker] {last_error}", file=sys.stderr)
+    if issue_store.last_synced_at() is not None:
+        _publish_if_changed()
+        if history.HISTORY_IN_WORKER:
+            history.record_if_due(_snapshot.frame)
+    trace.finish()
+
+
+def _run(sync):
+    while True:
+        try:
+            run_once(sync)
+            metrics.write_json()
+        except Exception as e:
+            print(f"[sync_worker] {datetime.now():%Y-%m-%d %H:%M:%S}: {e}", file=sys.stderr)
+        _wake.wait(WORKER_POLL_SECONDS)
+        _wake.clear()
+
+
+def wake():
+    """Look for new data now rather than at the next poll, e.g. after a webhook."""
+    _wake.set()
+
+
+def start(sync=SYNC_IN_DASHBOARD):
+    """Start the background worker once per process; later calls do nothing."""
+    global _thread
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(sync,), name="issue-sync-worker", daemon=True)
+            _thread.start()
+
+
+def latest(timeout=None):
+    """Return the newest snapshot, waiting up to `timeout` seconds for the first one."""
+    _first_snapshot.wait(timeout)
+    return _snapshot
+
+
+if __name__ == "__main__":
+    # Standalone syncing process; dashboards then run with SYNC_IN_DASHBOARD=false.
+    # The same loop as the dashboard's thread, so history and metrics are kept too
+    _run(sync=True)
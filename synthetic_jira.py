@@ -0,0 +1,102 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+# Vocabulary for PGP-shaped issues
+COMPONENTS = [
+    "Payments", "Refunds", "Settlement", "Onboarding", "Risk", "KYC", "Payouts",
+    "Reconciliation", "Checkout", "Wallet", "UPI", "Cards", "Net Banking", "EMI",
+    "Subscriptions", "Invoices", "Disputes", "Chargebacks", "Merchant Portal",
+    "Dashboard", "Reporting", "Notifications", "Webhooks", "Gateway Routing",
+    "Fraud Rules", "Ledger", "Tax", "Pricing", "Partner APIs", "Mobile SDK",
+    "Web SDK", "Admin Console", "Audit", "Auth", "Config Service", "Data Platform",
+    "Search", "Support Tools", "Compliance", "Infra",
+]
+STATUSES = ["To Do", "In Progress", "In Review", "QA", "In Testing", "Blocked", "Done"]
+STATUS_WEIGHTS = [20, 15, 6, 6, 5, 3, 45]
+ISSUE_TYPES = ["Story", "Bug", "Task", "Sub-task", "Epic"]
+ISSUE_TYPE_WEIGHTS = [35, 30, 25, 8, 2]
+PRIORITIES = ["Highest", "High", "Medium", "Low", "Lowest"]
+PRIORITY_WEIGHTS = [5, 20, 50, 20, 5]
+TASK_CATEGORIES = ["Feature", "Tech Debt", "Production Issue", "Compliance", "Support"]
+FIRST_NAMES = ["Aarav", "Asha", "Bala", "Chen", "Deepa", "Dev", "Farah", "Gaurav", "Isha",
+               "Karan", "Meera", "Nikhil", "Pooja", "Rahul", "Sana", "Tara", "Vikram", "Zoya"]
+LAST_NAMES = ["Rao", "Kumar", "Li", "Patel", "Shah", "Iyer", "Gupta", "Singh", "Nair", "Das"]
+VERBS = ["Fix", "Add", "Improve", "Refactor", "Investigate", "Migrate", "Remove", "Support",
+         "Handle", "Validate", "Optimise", "Document"]
+OBJECTS = ["refund", "payout", "settlement", "KYC check", "UPI mandate", "card token",
+           "merchant onboarding", "retry", "webhook", "ledger entry", "invoice", "report",
+           "dispute", "EMI plan", "timeout", "rate limit", "callback", "reconciliation job"]
+QUALIFIERS = ["flow", "API", "for large merchants", "on mobile", "in dashboard", "edge case",
+              "when bank is down", "after timeout", "in batch job", "for partial refunds"]
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _jira_time(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000%z")
+
+
+def _people(rng, count):
+    people = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f"{first.lower()}.{last.lower()}{i}"
+        people.append({
+            "name": username,
+            "key": username,
+            "displayName": f"{first} {last}",
+            "emailAddress": f"{username}@example.com",
+            "active": True,
+        })
+    return people
+
+
+def generate_issues(count, seed=0, project="PGP", now=None, assignees=60, days=730):
+    """Return `count` raw issue dicts shaped like Jira's search JSON.
+
+    Components follow a long-tailed distribution (some issues have none or
+    several), created dates skew recent over `days`, and about one in ten
+    issues is unassigned. The same seed always yields the same issues.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2026, 1, 1, 12, 0, tzinfo=IST)
+    people = _people(rng, assignees)
+    component_weights = [1 / (rank + 1) for rank in range(len(COMPONENTS))]
+    component_counts = [0, 1, 2, 3]
+    component_count_weights = [15, 70, 12, 3]
+
+    issues = []
+    for number in range(1, count + 1):
+        created = now - timedelta(days=days * rng.random() ** 2, seconds=rng.randint(0, 86400))
+        updated = min(now, created + timedelta(days=rng.expovariate(1 / 10)))
+        names = set()
+        for _ in range(rng.choices(component_counts, component_count_weights)[0]):
+            names.add(rng.choices(COMPONENTS, component_weights)[0])
+        category = rng.choice(TASK_CATEGORIES + [None])
+
+        issues.append({
+            "id": str(100000 + number),
+            "key": f"{project}-{number}",
+            "fields": {
+                "summary": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(QUALIFIERS)}",
+                "components": [{"name": name} for name in sorted(names)],
+                "status": {"name": rng.choices(STATUSES, STATUS_WEIGHTS)[0]},
+                "assignee": None if rng.random() < 0.1 else rng.choice(people),
+                "created": _jira_time(created),
+                "updated": _jira_time(updated),
+                "issuetype": {"name": rng.choices(ISSUE_TYPES, ISSUE_TYPE_WEIGHTS)[0]},
+                "priority": {"name": rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0]},
+                "customfield_21928": {"value": category} if category else None,
+            },
+        })
+    return issues
+
+
+def search_page(issues, start_at=0, max_results=100):
+    """Wrap issues in the envelope of a `json_result=True` search response."""
+    return {
+        "startAt": start_at,
+        "maxResults": max_results,
+        "total": len(issues),
+        "issues": issues[start_at:start_at + max_results],
+    }
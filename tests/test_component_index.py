@@ -0,0 +1,44 @@
+import json
+
+import aggregations
+import component_index
+import issue_store
+
+
+def _frame(component_lists):
+    count = len(component_lists)
+    return issue_store.build_frame({
+        "key": [f"PGP-{i}" for i in range(1, count + 1)],
+        "project": ["PGP"] * count,
+        "summary": ["Summary"] * count,
+        "components": [json.dumps(names) for names in component_lists],
+        "status": ["Open"] * count,
+        "assignee": ["Unassigned"] * count,
+        "created": ["2024-06-01T09:00:00.000+0000"] * count,
+        "issue_type": ["Task"] * count,
+        "priority": ["Medium"] * count,
+        "task_category": ["None"] * count,
+    }, today="2024-06-11")
+
+
+def test_component_names_containing_commas_stay_whole():
+    frame = _frame([["Payments, Refunds"], ["Payments, Refunds", "Core"], ["Payments"], []])
+
+    assert component_index.component_names(frame['Components']) == [
+        "Core", "No Component", "Payments", "Payments, Refunds"
+    ]
+    assert component_index.contains(frame['Components'], "Payments, Refunds").tolist() == [True, True, False, False]
+    assert component_index.contains(frame['Components'], "Refunds").tolist() == [False] * 4
+
+    index = component_index.build(frame)
+    assert component_index.rows(index, "Payments, Refunds").tolist() == [0, 1]
+    assert component_index.rows(index, "Payments").tolist() == [2]
+
+    cells = aggregations.component_cells(frame).set_index('Component')['Count']
+    assert cells.to_dict() == {"Payments, Refunds": 2, "Core": 1, "Payments": 1, "No Component": 1}
+
+
+def test_display_joins_components_with_commas():
+    frame = _frame([["Payments, Refunds", "Core"], ["Core"]])
+
+    assert component_index.display(frame)['Components'].tolist() == ["Payments, Refunds, Core", "Core"]
@@ -0,0 +1,22 @@
+from datetime import date
+
+import history
+from test_component_index import _frame
+
+
+def test_history_without_open_tickets_loads_with_its_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_DIR", str(tmp_path))
+    assert list(history.load("aging").columns) == ["Date"] + history.TABLE_COLUMNS["aging"]
+
+    done = _frame([["Core"], ["Payments, Refunds"]]).assign(Status="Done")
+    history.record(done, date(2024, 6, 10))
+    history.record(done, date(2024, 6, 11))
+
+    aging = history.load("aging", date(2024, 6, 1))
+    assert aging.empty
+    assert list(aging.columns) == ["Date"] + history.TABLE_COLUMNS["aging"]
+    assert aging[(aging['Project'] == history.ALL) & (aging['Component'] == history.ALL)].empty
+
+    cells = history.load("component_status", date(2024, 6, 1))
+    assert history.open_counts(cells, 'Component').empty
+    assert len(cells) == 4
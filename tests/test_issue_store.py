@@ -0,0 +1,89 @@
+import issue_store
+
+
+def test_project_of_matches_projects_named_in_base_jql(monkeypatch):
+    monkeypatch.setattr(issue_store, "PROJECTS", issue_store.parse_projects(
+        "PGP: project = PGP AND status not in (Queue); OPS: project in (OPS, \"SRE\"); RISK: filter = 12345"
+    ))
+
+    assert issue_store.project_of("PGP-1") == "PGP"
+    assert issue_store.project_of("SRE-7") == "OPS"
+    assert issue_store.project_of("RISK-3") == "RISK"
+    assert issue_store.project_of("MOVED-1", jira_project="PGP") == "PGP"
+    assert issue_store.project_of("PAY-1") is None
+
+
+def test_single_project_ignores_other_projects(monkeypatch):
+    monkeypatch.setattr(issue_store, "PROJECTS", issue_store.parse_projects("PGP: project = PGP"))
+
+    assert issue_store.project_of("PGP-1") == "PGP"
+    assert issue_store.project_of("PAY-1") is None
+    assert issue_store.project_of("PGP-1", jira_project="PAY") is None
+
+
+class FakeJira:
+    """Answers searches from a fixed list of raw issues, recording each JQL."""
+
+    def __init__(self, issues):
+        self.issues = issues
+        self.jql = []
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None, expand=None, json_result=True):
+        self.jql.append(jql)
+        page = self.issues[startAt:startAt + maxResults]
+        return {"startAt": startAt, "maxResults": maxResults, "total": len(self.issues), "issues": page}
+
+
+def _issue(key, updated, status="Open"):
+    return {"key": key, "fields": {
+        "summary": f"Ticket {key}", "components": [], "status": {"name": status}, "assignee": None,
+        "created": "2024-06-01T09:00:00.000+0000", "updated": updated,
+        "issuetype": {"name": "Task"}, "priority": None,
+    }}
+
+
+def test_sync_resumes_from_its_high_water_mark_with_an_overlap(tmp_path, monkeypatch):
+    monkeypatch.setattr(issue_store, "PROJECTS", issue_store.parse_projects("PGP: project = PGP"))
+    path = str(tmp_path / "issues.sqlite3")
+    jira = FakeJira([_issue("PGP-1", "2024-06-10T12:00:00.000+0000"),
+                     _issue("PGP-2", "2024-06-11T08:30:00.000+0000")])
+
+    assert issue_store.sync(jira, "PGP", path) == 2
+    assert jira.jql[-1] == "(project = PGP) ORDER BY key ASC"
+
+    # The overlap re-fetches PGP-2, but an unchanged issue isn't counted again
+    assert issue_store.sync(jira, "PGP", path) == 0
+    assert jira.jql[-1] == '(project = PGP) AND updated >= "2024/06/11 08:25" ORDER BY key ASC'
+
+    jira.issues = [_issue("PGP-1", "2024-06-11T09:00:00.000+0000", status="Done")]
+    assert issue_store.sync(jira, "PGP", path) == 1
+    # An empty search doesn't move the mark back
+    jira.issues = []
+    issue_store.sync(jira, "PGP", path)
+    issue_store.sync(jira, "PGP", path)
+    assert jira.jql[-2:] == ['(project = PGP) AND updated >= "2024/06/11 08:55" ORDER BY key ASC'] * 2
+
+
+def test_webhooks_arriving_out_of_order_keep_the_newest_issue(tmp_path, monkeypatch):
+    monkeypatch.setattr(issue_store, "PROJECTS", issue_store.parse_projects("PGP: project = PGP"))
+    path = str(tmp_path / "issues.sqlite3")
+    newer = _issue("PGP-1", "2024-06-11T10:00:00.000+0000", status="Done")
+    older = _issue("PGP-1", "2024-06-11T09:00:00.000+0000", status="In Progress")
+
+    assert issue_store.apply_webhook("jira:issue_updated", newer, path=path)
+    version = issue_store.data_version(path)
+    assert not issue_store.apply_webhook("jira:issue_updated", older, path=path)
+    assert issue_store.data_version(path) == version
+
+    conn = issue_store.connect(path)
+    try:
+        assert conn.execute("SELECT status, updated FROM issues WHERE key = 'PGP-1'").fetchall() == [
+            ("Done", "2024-06-11T10:00:00.000+0000")
+        ]
+    finally:
+        conn.close()
+
+    # A late event's status change is still recorded at the time it happened
+    changelog = {"items": [{"field": "status", "fromString": "Open", "toString": "In Progress"}]}
+    assert issue_store.apply_webhook("jira:issue_updated", older, changelog, timestamp=1718096400000, path=path)
+    assert issue_store.load_timeline(path)["Status"].tolist() == ["Open", "In Progress"]
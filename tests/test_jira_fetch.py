@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from jira import JIRAError
+
+import jira_fetch
+
+
+class FakeJira:
+    """Serves changelogs 100 histories at a time, like Jira Cloud."""
+
+    def __init__(self, changelogs, endpoint=True):
+        self.changelogs = changelogs
+        self.endpoint = endpoint
+        self.requests = []
+
+    def _get_json(self, path, params=None):
+        self.requests.append((path, params["startAt"]))
+        if not self.endpoint:
+            raise JIRAError(status_code=404)
+        key = path.split("/")[1]
+        values = self.changelogs[key][params["startAt"]:params["startAt"] + min(params["maxResults"], 100)]
+        return {"startAt": params["startAt"], "total": len(self.changelogs[key]), "values": values,
+                "isLast": params["startAt"] + len(values) >= len(self.changelogs[key])}
+
+    def issue(self, key, fields=None, expand=None):
+        return SimpleNamespace(raw={"changelog": {"histories": self.changelogs[key]}})
+
+
+def test_fetch_changelogs_pages_past_100_histories():
+    changelogs = {"PGP-1": [{"id": str(i)} for i in range(250)], "PGP-2": [{"id": "0"}]}
+    jira = FakeJira(changelogs)
+
+    assert jira_fetch.fetch_changelogs(jira, ["PGP-1", "PGP-2"], page_size=100) == changelogs
+    assert sorted(jira.requests) == [
+        ("issue/PGP-1/changelog", 0), ("issue/PGP-1/changelog", 100), ("issue/PGP-1/changelog", 200),
+        ("issue/PGP-2/changelog", 0),
+    ]
+
+
+def test_fetch_changelogs_falls_back_without_the_endpoint():
+    changelogs = {"PGP-1": [{"id": str(i)} for i in range(150)]}
+
+    assert jira_fetch.fetch_changelogs(FakeJira(changelogs, endpoint=False), ["PGP-1"]) == changelogs
@@ -0,0 +1,101 @@
+import json
+import sqlite3
+from email.mime.text import MIMEText
+
+import pytest
+
+import jira_gateway
+import outbox
+import reminders
+
+DAY = "2024-06-11"
+ASSIGNEES = {"PGP-1": "u1", "PGP-2": "u1", "PGP-3": "u1", "PGP-4": "u2"}
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.emailAddress = f"{user_id}@example.com"
+
+
+class FakeJira:
+    def user(self, user_id):
+        return FakeUser(user_id)
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    monkeypatch.setattr(reminders.issue_store, "assignee_ids", lambda keys: {key: ASSIGNEES[key] for key in keys})
+    monkeypatch.setattr(jira_gateway, "get_jira", FakeJira)
+    return str(tmp_path / "outbox.sqlite3")
+
+
+def _intents(*keys):
+    return {
+        key: json.dumps({"Key": key, "Summary": f"Ticket {key}", "Status": "Open",
+                         "Created": "2024-06-01T00:00:00.000", "Assignee": ASSIGNEES[key]})
+        for key in keys
+    }
+
+
+def _messages(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT idempotency_key, message FROM outbox ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_dry_run_does_not_use_up_the_days_reminder(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    keys = ["PGP-1", "PGP-2"]
+
+    assert outbox.enqueue("dev@example.com", MIMEText("dry"), keys, dry_run=True, day=DAY, path=path)
+    assert outbox.already_reminded(keys, day=DAY, path=path) == set()
+
+    assert outbox.enqueue("dev@example.com", MIMEText("real"), keys, day=DAY, path=path)
+    assert outbox.already_reminded(keys, day=DAY, path=path) == set(keys)
+    assert not outbox.enqueue("dev@example.com", MIMEText("real"), keys, day=DAY, path=path)
+    assert outbox.counts(path)["queued"] == 2
+
+
+def test_enqueue_refuses_tickets_already_reminded(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+
+    assert outbox.enqueue("dev@example.com", MIMEText("first"), ["PGP-1", "PGP-2"], day=DAY, path=path)
+    assert not outbox.enqueue("dev@example.com", MIMEText("overlap"), ["PGP-2", "PGP-3"], day=DAY, path=path)
+    assert outbox.enqueue("dev@example.com", MIMEText("later"), ["PGP-3"], day=DAY, path=path)
+
+    assert [key for key, _ in _messages(path)] == [f"{DAY}:dev@example.com:0", f"{DAY}:dev@example.com:1"]
+
+
+def test_rerunning_reminders_sends_each_digest_once(path):
+    assert outbox.add_intents(_intents("PGP-1", "PGP-2", "PGP-4"), day=DAY, path=path) == 3
+    assert reminders.prepare_reminders(path) == 3
+
+    assert outbox.add_intents(_intents("PGP-1", "PGP-2", "PGP-4"), day=DAY, path=path) == 0
+    assert reminders.prepare_reminders(path) == 0
+    assert len(_messages(path)) == 2
+
+
+def test_crash_after_enqueue_does_not_send_again(path, monkeypatch):
+    outbox.add_intents(_intents("PGP-1", "PGP-2"), day=DAY, path=path)
+    resolve_intents = outbox.resolve_intents
+
+    def crash(ticket_keys, day, dry_run, status, path):
+        if ticket_keys:
+            raise RuntimeError("crashed before marking intents queued")
+
+    monkeypatch.setattr(outbox, "resolve_intents", crash)
+    with pytest.raises(RuntimeError):
+        reminders.prepare_reminders(path)
+    monkeypatch.setattr(outbox, "resolve_intents", resolve_intents)
+
+    # The retry groups a new ticket in with the ones already queued
+    outbox.add_intents(_intents("PGP-3"), day=DAY, path=path)
+    assert reminders.prepare_reminders(path) == 3
+
+    messages = _messages(path)
+    assert len(messages) == 2
+    assert "PGP-1" in messages[0][1] and "PGP-3" not in messages[0][1]
+    assert "PGP-3" in messages[1][1] and "PGP-1" not in messages[1][1]
+    assert outbox.counts(path)["pending"] == 0
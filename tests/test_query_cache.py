@@ -0,0 +1,47 @@
+import component_index
+import query_cache
+from test_component_index import _frame
+
+
+def test_covers_wider_queries_only():
+    board = query_cache.make_query()
+    june = query_cache.make_query("PGP", "Core", "2024-06-01", "2024-06-30")
+
+    assert query_cache.covers(board, june)
+    assert query_cache.covers(query_cache.make_query("PGP"), june)
+    assert query_cache.covers(query_cache.make_query("PGP", created_from="2024-05-01"), june)
+    assert query_cache.covers(june, june)
+    assert not query_cache.covers(june, board)
+    assert not query_cache.covers(query_cache.make_query("PAY"), june)
+    assert not query_cache.covers(query_cache.make_query(component="Payments"), june)
+    assert not query_cache.covers(query_cache.make_query(created_from="2024-06-15"), june)
+    assert not query_cache.covers(query_cache.make_query(created_to="2024-06-15"), june)
+    assert not query_cache.covers(query_cache.make_query(created_to="2024-06-30"), query_cache.make_query())
+
+
+def test_narrow_matches_every_component_with_or_without_an_index():
+    frame = _frame([["Core"], ["Payments", "Core"], ["Payments"], []])
+    query = query_cache.make_query("PGP", "Core")
+
+    assert query_cache.narrow(frame, query)['Key'].tolist() == ["PGP-1", "PGP-2"]
+    assert query_cache.narrow(frame, query, component_index.build(frame))['Key'].tolist() == ["PGP-1", "PGP-2"]
+    assert query_cache.narrow(frame, query_cache.make_query(created_to="2024-05-31")).empty
+
+
+def test_subsumed_query_is_narrowed_from_the_cached_frame():
+    frame = _frame([["Core"], ["Payments"], ["Core"]])
+    cache = query_cache.QueryCache()
+    loads = []
+
+    def loader(query):
+        loads.append(query)
+        return query_cache.narrow(frame, query)
+
+    assert len(cache.get(1, query_cache.make_query(), loader)) == 3
+    core = cache.get(1, query_cache.make_query("PGP", "Core"), loader)
+    assert core['Key'].tolist() == ["PGP-1", "PGP-3"]
+    assert (cache.subsumed, cache.misses, len(loads)) == (1, 1, 1)
+
+    # Another data version never reuses the older frames
+    cache.get(2, query_cache.make_query("PGP", "Core"), loader)
+    assert (cache.misses, len(loads)) == (2, 2)
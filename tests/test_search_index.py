@@ -0,0 +1,49 @@
+import pandas as pd
+
+import search_index
+
+
+def _frame(summaries):
+    return pd.DataFrame({
+        "Key": [f"PGP-{i}" for i in range(1, len(summaries) + 1)],
+        "Summary": summaries,
+    })
+
+
+def _keys(frame, index, query):
+    rows, _ = search_index.search(index, query)
+    return frame['Key'].iloc[rows].tolist()
+
+
+def test_prefixes_match_and_whole_words_rank_first():
+    frame = _frame(["Payments timeout", "Pay page broken", "Login timeout", "Payroll export", None])
+    index = search_index.build(frame)
+
+    assert _keys(frame, index, "pay") == ["PGP-2", "PGP-1", "PGP-4"]
+    assert _keys(frame, index, "Paym") == ["PGP-1"]
+    # Every word must match; the last one may still be being typed
+    assert _keys(frame, index, "timeout pay") == ["PGP-1"]
+    assert _keys(frame, index, "pgp-3") == ["PGP-3"]
+    assert _keys(frame, index, "refund") == []
+    assert _keys(frame, index, " - ") == []
+
+
+def test_rare_words_rank_above_common_ones():
+    frame = _frame(["Checkout error", "Checkout error", "Checkout error", "Checkout refund error"])
+    index = search_index.build(frame)
+
+    keys = _keys(frame, index, "checkout re")
+    assert keys[0] == "PGP-4"
+    # Equal scores keep frame order
+    assert _keys(frame, index, "error") == ["PGP-1", "PGP-2", "PGP-3", "PGP-4"]
+
+
+def test_rebuild_reindexes_edited_summaries():
+    frame = _frame(["Payments timeout", "Login timeout"])
+    previous = search_index.build(frame)
+    frame.loc[1, "Summary"] = "Payments login"
+    index = search_index.build(frame, previous)
+
+    assert _keys(frame, index, "payments") == ["PGP-1", "PGP-2"]
+    assert _keys(frame, index, "timeout") == ["PGP-1"]
+    assert set(index.vocabulary.texts) == {"PGP-1 Payments timeout", "PGP-2 Payments login"}
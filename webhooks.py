@@ -0,0 +1,196 @@
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import issue_store
+import metrics
+
+# Webhook receiver configuration
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "0"))           # 0 disables the receiver
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")            # required to start the receiver
+WEBHOOK_PATH = "/jira-webhook"
+MAX_BODY_BYTES = 1024 * 1024
+
+EVENTS = ("jira:issue_created", "jira:issue_updated", "jira:issue_deleted")
+
+_start_lock = threading.Lock()
+_server = None
+
+
+class InvalidWebhook(Exception):
+    """Raised for a request body that isn't a usable Jira issue webhook."""
+
+
+def signature(body, secret=WEBHOOK_SECRET):
+    """The `X-Hub-Signature` header value Jira sends for `body`."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify(body, header=None, token=None, secret=WEBHOOK_SECRET):
+    """Check a request against the shared secret.
+
+    Jira Cloud signs the body (`X-Hub-Signature`); Jira Server/Data Center
+    can't, so its webhook URL carries the secret as `?secret=`.
+    """
+    if not secret:
+        return False
+    if header:
+        return hmac.compare_digest(header, signature(body, secret))
+    return token is not None and hmac.compare_digest(token, secret)
+
+
+def parse(body):
+    """Decode and validate a webhook body; returns the payload dict."""
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise InvalidWebhook(f"body is not JSON: {e}")
+    if not isinstance(payload, dict) or not isinstance(payload.get("webhookEvent"), str):
+        raise InvalidWebhook("missing webhookEvent")
+    if payload["webhookEvent"] not in EVENTS:
+        return payload
+    issue = payload.get("issue")
+    if not isinstance(issue, dict) or not isinstance(issue.get("key"), str):
+        raise InvalidWebhook("missing issue key")
+    if payload["webhookEvent"] != "jira:issue_deleted":
+        fields = issue.get("fields")
+        missing = [name for name in ("status", "created", "updated", "issuetype")
+                   if not isinstance(fields, dict) or not fields.get(name)]
+        if missing:
+            raise InvalidWebhook(f"issue {issue['key']} is missing {', '.join(missing)}")
+    return payload
+
+
+def apply(payload, path=issue_store.STORE_PATH):
+    """Apply a parsed webhook to the issue store; True if stored data changed."""
+    if payload["webhookEvent"] not in EVENTS:
+        metrics.inc("webhooks_ignored")
+        return False
+    with metrics.timed("webhook.apply"):
+        changed = issue_store.apply_webhook(
+            payload["webhookEvent"], payload["issue"], payload.get("changelog"), payload.get("timestamp"), path
+        )
+    metrics.inc("webhooks_applied")
+    return changed
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    # Set by start(): called after a webhook changed the store
+    on_change = None
+
+    def _reply(self, code, message=""):
+        body = message.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != WEBHOOK_PATH:
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._reply(413, "payload too large")
+            return
+        body = self.rfile.read(length)
+        metrics.inc("webhooks_received")
+        token = parse_qs(url.query).get("secret", [None])[0]
+        if not verify(body, self.headers.get("X-Hub-Signature"), token):
+            metrics.inc("webhooks_rejected")
+            self._reply(401, "bad signature")
+            return
+        try:
+            changed = apply(parse(body))
+        except InvalidWebhook as e:
+            metrics.inc("webhooks_rejected")
+            self._reply(400, str(e))
+            return
+        except Exception as e:
+            # Jira retries failed deliveries, and the reconcile sweep catches the rest
+            print(f"[webhooks] {e}", file=sys.stderr)
+            self._reply(500, "could not apply webhook")
+            return
+        if changed and self.on_change is not None:
+            self.on_change()
+        self._reply(204)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port=WEBHOOK_PORT, on_change=None):
+    """Receive Jira webhooks on `port` once per process (0 disables it).
+
+    `on_change` is called after a webhook changed the store, e.g. to publish
+    a new snapshot right away. Without WEBHOOK_SECRET nothing is started.
+    """
+    global _server
+    if not port:
+        return
+    with _start_lock:
+        if _server is not None:
+            return
+        if not WEBHOOK_SECRET:
+            print("[webhooks] WEBHOOK_SECRET is not set; not receiving webhooks", file=sys.stderr)
+            return
+        handler = type("WebhookHandler", (_WebhookHandler,), {"on_change": staticmethod(on_change)})
+        _server = ThreadingHTTPServer(("", port), handler)
+        threading.Thread(target=_server.serve_forever, name="webhook-receiver", daemon=True).start()
+
+
+def replay(paths, url=None, store=issue_store.STORE_PATH, secret=WEBHOOK_SECRET):
+    """Replay saved webhook payloads, for testing without Jira.
+
+    Each file is POSTed (signed) to a running receiver at `url`, or applied
+    straight to `store` when no url is given.
+    """
+    for path in paths:
+        with open(path, "rb") as f:
+            body = f.read()
+        if url:
+            request = urllib.request.Request(url, data=body, method="POST", headers={
+                "Content-Type": "application/json",
+                "X-Hub-Signature": signature(body, secret),
+            })
+            with urllib.request.urlopen(request) as response:
+                print(f"{path}: HTTP {response.status}")
+        else:
+            changed = apply(parse(body), store)
+            print(f"{path}: {'applied' if changed else 'no change'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Receive or replay Jira issue webhooks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the receiver on its own (e.g. next to sync_worker.py)")
+    serve.add_argument("--port", type=int, default=WEBHOOK_PORT or 8502)
+    replayer = commands.add_parser("replay", help="replay saved webhook payloads")
+    replayer.add_argument("files", nargs="+")
+    replayer.add_argument("--url", help=f"POST to a running receiver, e.g. http://localhost:8502{WEBHOOK_PATH}")
+    replayer.add_argument("--store", default=issue_store.STORE_PATH, help="issue store to apply them to")
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        replay(args.files, args.url, args.store)
+        return 0
+    start(args.port)
+    if _server is None:
+        return 1
+    print(f"Receiving Jira webhooks on :{args.port}{WEBHOOK_PATH}")
+    while True:
+        time.sleep(60)
+
+
+if __name__ == "__main__":
+    sys.exit(main())